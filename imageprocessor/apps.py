@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ImageprocessorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'imageprocessor'
+
+    def ready(self):
+        from . import checks  # noqa: F401 (registers system checks)
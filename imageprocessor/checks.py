@@ -0,0 +1,17 @@
+from django.core.checks import Warning, register
+
+
+@register()
+def check_openai_api_key(app_configs, **kwargs):
+    """Warn at startup when OPENAI_API_KEY is missing instead of on the first processing request"""
+    from .services import OPENAI_API_KEY
+
+    if OPENAI_API_KEY:
+        return []
+    return [
+        Warning(
+            "OPENAI_API_KEY is not set; image analysis and outfit recommendations will fail.",
+            hint="Set it in the environment or .env (see setup_api_key.py).",
+            id='imageprocessor.W001',
+        )
+    ]
@@ -0,0 +1,79 @@
+import numpy as np
+from PIL import Image
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# sRGB (D65) -> XYZ matrix and D65 reference white
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+], dtype=np.float32)
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883], dtype=np.float32)
+
+# Pixels brighter than this in every channel count as the white product-photo background
+BACKGROUND_THRESHOLD = 245
+
+
+def rgb_to_lab(rgb):
+    """Convert an (..., 3) uint8 sRGB array to CIELAB (float32)"""
+    linear = rgb.astype(np.float32) / 255.0
+    linear = np.where(linear > 0.04045, ((linear + 0.055) / 1.055) ** 2.4, linear / 12.92)
+    xyz = (linear @ _RGB_TO_XYZ.T) / _D65_WHITE
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    lab = np.empty_like(f)
+    lab[..., 0] = 116 * f[..., 1] - 16
+    lab[..., 1] = 500 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200 * (f[..., 1] - f[..., 2])
+    return lab
+
+
+def _mean_delta_e_numpy(lab_a, lab_b, mask):
+    """Mean CIE76 colour difference over the masked pixels (NumPy fallback)"""
+    if not mask.any():
+        return np.nan
+    return float(np.linalg.norm(lab_a[mask] - lab_b[mask], axis=-1).mean())
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _mean_delta_e(lab_a, lab_b, mask):
+        """Mean CIE76 colour difference over the masked pixels (Numba kernel)"""
+        height, width = mask.shape
+        total = 0.0
+        count = 0
+        for y in prange(height):
+            for x in range(width):
+                if mask[y, x]:
+                    dl = lab_a[y, x, 0] - lab_b[y, x, 0]
+                    da = lab_a[y, x, 1] - lab_b[y, x, 1]
+                    db = lab_a[y, x, 2] - lab_b[y, x, 2]
+                    total += np.sqrt(dl * dl + da * da + db * db)
+                    count += 1
+        return total / count if count else np.nan
+else:
+    _mean_delta_e = _mean_delta_e_numpy
+
+
+def mean_delta_e(rgb_a, rgb_b, mask=None):
+    """Mean ΔE (CIE76) between two same-sized uint8 RGB arrays, optionally over a boolean mask"""
+    if mask is None:
+        mask = np.ones(rgb_a.shape[:2], dtype=np.bool_)
+    return float(_mean_delta_e(rgb_to_lab(rgb_a), rgb_to_lab(rgb_b), mask))
+
+
+def color_preservation_delta_e(original_image, processed_image):
+    """Mean ΔE between an original photo and its processed version over the garment (non-background) pixels
+
+    Returns None when the processed image has no garment pixels. Below ~10 the colours read as the same garment.
+    """
+    original = np.asarray(original_image.convert('RGB'))
+    processed_image = processed_image.convert('RGB')
+    if processed_image.size != original_image.size:
+        processed_image = processed_image.resize(original_image.size, Image.Resampling.LANCZOS)
+    processed = np.asarray(processed_image)
+    garment_mask = ~(processed > BACKGROUND_THRESHOLD).all(axis=-1)
+    delta_e = mean_delta_e(original, processed, garment_mask)
+    return None if np.isnan(delta_e) else delta_e
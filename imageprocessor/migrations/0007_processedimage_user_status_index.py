@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-16 01:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imageprocessor', '0006_outfitrecommendation_user_processedimage_user_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='processedimage',
+            index=models.Index(fields=['user', 'status'], name='imageproces_user_id_80a980_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# Columns matched by the wardrobe search box (name/brand/material icontains)
+SEARCH_COLUMNS = ['name', 'brand', 'material']
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Back icontains search with pg_trgm GIN indexes (PostgreSQL only)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        # icontains compiles to UPPER("col"::text) LIKE UPPER(%s), so index that expression
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS wi_{column}_trgm ON imageprocessor_wardrobeitem '
+            f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS wi_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imageprocessor', '0007_processedimage_user_status_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-16 01:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imageprocessor', '0008_wardrobeitem_search_trgm_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outfitrecommendation',
+            index=models.Index(fields=['user', '-created_at'], name='imageproces_user_id_1592cc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processedimage',
+            index=models.Index(fields=['user', '-created_at'], name='imageproces_user_id_f19562_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wardrobeitem',
+            index=models.Index(fields=['user', 'category'], name='imageproces_user_id_af50b3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wardrobeitem',
+            index=models.Index(fields=['user', 'is_favorite'], name='imageproces_user_id_9946d2_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-16 01:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imageprocessor', '0009_list_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wardrobeitem',
+            name='style_embedding',
+            field=models.BinaryField(blank=True, help_text="Normalized float32 embedding of the item's style attributes", null=True),
+        ),
+    ]
@@ -97,6 +97,12 @@ class ProcessedImage(models.Model):
         ordering = ['-created_at']
         verbose_name = "Processed Image"
         verbose_name_plural = "Processed Images"
+        indexes = [
+            # Image list is the owner's images, newest first
+            models.Index(fields=['user', '-created_at']),
+            # Status polling filters on owner and status
+            models.Index(fields=['user', 'status']),
+        ]
     
     def __str__(self):
         return f"{self.get_clothing_type_display()} - {self.status} ({self.created_at.strftime('%Y-%m-%d %H:%M')})"
@@ -214,6 +220,12 @@ class WardrobeItem(models.Model):
         null=True,
         help_text="Style tags for matching"
     )
+    style_embedding = models.BinaryField(
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Normalized float32 embedding of the item's style attributes"
+    )
     
     # User preferences
     is_favorite = models.BooleanField(default=False, help_text="Mark as favorite item")
@@ -228,6 +240,11 @@ class WardrobeItem(models.Model):
         ordering = ['-created_at']
         verbose_name = "Wardrobe Item"
         verbose_name_plural = "Wardrobe Items"
+        indexes = [
+            # Wardrobe list filters by owner plus category / favourites
+            models.Index(fields=['user', 'category']),
+            models.Index(fields=['user', 'is_favorite']),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.get_category_display()})"
@@ -243,6 +260,16 @@ class WardrobeItem(models.Model):
         if self.processed_image and self.processed_image.original_image:
             return self.processed_image.original_image.url
         return None
+    
+    @property
+    def best_image_path(self):
+        """Get the path of the processed image on disk, falling back to the original image"""
+        processed_image = self.processed_image
+        if processed_image:
+            for image_field in (processed_image.processed_image, processed_image.original_image):
+                if image_field and os.path.exists(image_field.path):
+                    return image_field.path
+        return None
 
 
 class OutfitRecommendation(models.Model):
@@ -329,6 +356,10 @@ class OutfitRecommendation(models.Model):
         ordering = ['-confidence_score', '-created_at']
         verbose_name = "Outfit Recommendation"
         verbose_name_plural = "Outfit Recommendations"
+        indexes = [
+            # Saved outfits are the owner's outfits, newest first
+            models.Index(fields=['user', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.get_occasion_display()}"
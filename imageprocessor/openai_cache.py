@@ -0,0 +1,39 @@
+import hashlib
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Results for the same image bytes, prompt kind and model don't change, so keep them for a month
+OPENAI_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def make_cache_key(image_bytes, clothing_type, model, prompt_version):
+    """Build the cache key for an image; model id and prompt version are part of it so upgrades invalidate old entries"""
+    return f"openai:{model}:{prompt_version}:{clothing_type}:{hashlib.sha256(image_bytes).hexdigest()}"
+
+
+def get_or_compute(image_bytes, clothing_type, model, prompt_version, compute_fn):
+    """Return the cached OpenAI result for this image, or call compute_fn and cache it if successful"""
+    key = make_cache_key(image_bytes, clothing_type, model, prompt_version)
+    result = cache.get(key)
+    if result is not None:
+        # Processed image bytes are stored under their own key
+        if result.pop('has_processed_image', False):
+            processed_image_data = cache.get(f"{key}:image")
+            if processed_image_data is not None:
+                logger.info(f"OpenAI cache hit for {key}")
+                return {**result, 'processed_image_data': processed_image_data}
+        else:
+            logger.info(f"OpenAI cache hit for {key}")
+            return result
+
+    result = compute_fn()
+    if result.get('success'):
+        metadata = {k: v for k, v in result.items() if k != 'processed_image_data'}
+        if 'processed_image_data' in result:
+            metadata['has_processed_image'] = True
+            cache.set(f"{key}:image", result['processed_image_data'], OPENAI_CACHE_TIMEOUT)
+        cache.set(key, metadata, OPENAI_CACHE_TIMEOUT)
+    return result
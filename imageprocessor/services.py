@@ -3,18 +3,39 @@ import base64
 import requests
 import tempfile
 import json
+import hashlib
+import re
+import shutil
+import traceback
 from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django.db.models import Q
+import httpx
 from openai import OpenAI
+try:
+    import h2  # enables HTTP/2 in httpx
+except ImportError:
+    h2 = None
 try:
     from google import genai
+    from google.genai import errors as genai_errors
 except ImportError:
     genai = None
-from PIL import Image, ImageDraw, ImageFont
+    genai_errors = None
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+import numpy as np
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
 from io import BytesIO
 import logging
 from .models import ProcessedImage, WardrobeItem, OutfitRecommendation, OutfitItem
+from .openai_cache import get_or_compute
 
 # LangChain imports
 from langchain_openai import ChatOpenAI
@@ -30,12 +51,230 @@ import concurrent.futures
 import time
 import random
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict
+from functools import lru_cache
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
+FONT_REGULAR_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+FONT_BOLD_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+# Rows per INSERT for bulk saves (keeps large saves under backend parameter limits)
+BULK_BATCH_SIZE = 500
+
+# Valid BMP DIB header sizes (BITMAPCOREHEADER ... BITMAPV5HEADER), stored little-endian at offset 14
+BMP_DIB_HEADER_SIZES = frozenset({12, 40, 52, 56, 108, 124})
+
+# Copy size when streaming rendered images into caller-provided files
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# zlib level for generated outfit PNGs: fastest encode, output is still lossless and only slightly larger
+OUTFIT_PNG_COMPRESS_LEVEL = 1
+
+# Read once at import (settings has already loaded .env); missing keys are reported by the imageprocessor system check
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+
+# Shared OpenAI HTTP pool; vision/image calls can take close to a minute
+OPENAI_HTTP_TIMEOUT = 60
+OPENAI_MAX_KEEPALIVE = 20
+
+# GPT-4o "high" detail fits images into 2048x2048 and then scales the short side to 768,
+# so anything larger is only extra upload bytes
+VISION_MAX_LONG_SIDE = 2048
+VISION_MAX_SHORT_SIDE = 768
+VISION_SKIP_SIDE = 512
+VISION_JPEG_QUALITY = 85
+
+# Gemini failures worth retrying: transport errors (the SDK talks HTTP through httpx) and 5xx responses
+GEMINI_TRANSIENT_ERRORS = (httpx.TransportError,) + ((genai_errors.ServerError,) if genai_errors is not None else ())
+
+# Style embeddings are computed once per analysed item and stored on WardrobeItem.style_embedding
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Clothing types we know about, mapped to the wardrobe category the analysis should report
+CLOTHING_TYPE_CATEGORIES = MappingProxyType({
+    'shirt': 'top', 'tshirt': 'top', 'sweater': 'top', 'hoodie': 'top', 'blouse': 'top', 'top': 'top',
+    'jacket': 'outerwear', 'coat': 'outerwear', 'outerwear': 'outerwear',
+    'pants': 'bottom', 'skirt': 'bottom', 'shorts': 'bottom', 'jeans': 'bottom', 'bottom': 'bottom',
+    'dress': 'dress',
+    'shoes': 'shoes', 'sneakers': 'shoes', 'heels': 'shoes', 'boots': 'shoes',
+    'watch': 'accessories', 'belt': 'accessories', 'hat': 'accessories', 'bag': 'accessories', 'accessories': 'accessories'
+})
+
+
+def _format_prompts(template, clothing_types):
+    """Format a prompt template once per known clothing type into a read-only lookup table"""
+    return MappingProxyType({t: template.format(clothing_type=t) for t in clothing_types})
+
+
+@lru_cache(maxsize=None)
+def _load_font(path, size):
+    """Load a TrueType font once, falling back to the default font if not available"""
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1024)
+def _placeholder(size, label):
+    """Render a placeholder tile for an item without a usable image (shared, do not mutate)"""
+    img = Image.new('RGB', (size, size), '#f0f0f0')
+    ImageDraw.Draw(img).text((size // 8, size // 2), label, fill='#999999', font=_load_font(FONT_REGULAR_PATH, 12))
+    return img
+
+
+def _blit_tiles_numpy(canvas, tiles, xs, ys, sizes):
+    """Alpha-blend RGBA tiles onto an RGB canvas in place (NumPy fallback)"""
+    height, width = canvas.shape[0], canvas.shape[1]
+    for i in range(tiles.shape[0]):
+        x, y, size = int(xs[i]), int(ys[i]), int(sizes[i])
+        # Clip the tile to the canvas bounds
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + size, width), min(y + size, height)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        tile = tiles[i, y0 - y:y1 - y, x0 - x:x1 - x].astype(np.uint16)
+        alpha = tile[:, :, 3:4]
+        dst = canvas[y0:y1, x0:x1].astype(np.uint16)
+        canvas[y0:y1, x0:x1] = ((tile[:, :, :3] * alpha + dst * (255 - alpha) + 127) // 255).astype(np.uint8)
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _blit_tiles(canvas, tiles, xs, ys, sizes):
+        """Alpha-blend RGBA tiles onto an RGB canvas in place (Numba kernel)"""
+        height, width = canvas.shape[0], canvas.shape[1]
+        # Tiles may overlap, so they are composited in order; rows within a tile are independent
+        for i in range(tiles.shape[0]):
+            x, y, size = xs[i], ys[i], sizes[i]
+            for ty in prange(size):
+                cy = y + ty
+                if cy < 0 or cy >= height:
+                    continue
+                for tx in range(size):
+                    cx = x + tx
+                    if cx < 0 or cx >= width:
+                        continue
+                    alpha = np.uint16(tiles[i, ty, tx, 3])
+                    for c in range(3):
+                        src = np.uint16(tiles[i, ty, tx, c])
+                        dst = np.uint16(canvas[cy, cx, c])
+                        canvas[cy, cx, c] = np.uint8((src * alpha + dst * (255 - alpha) + 127) // 255)
+else:
+    _blit_tiles = _blit_tiles_numpy
+
+
+def _grid_cell_origin(index, cols, cell_width, cell_height, padding, margin, header_height):
+    """Get the top-left corner of a cell in the outfit composite grid"""
+    row, col = divmod(index, cols)
+    return (
+        margin + col * (cell_width + padding),
+        margin + header_height + row * (cell_height + padding),
+    )
+
+
+@lru_cache(maxsize=32)
+def _grid_template(count, cols, rows, cell_width, cell_height, padding, margin, header_height):
+    """Render a blank composite canvas with the border of each used grid cell (shared, copy before drawing)"""
+    total_width = (cell_width * cols) + (padding * (cols - 1)) + (margin * 2)
+    total_height = (cell_height * rows) + (padding * (rows - 1)) + (margin * 2) + header_height
+    template = Image.new('RGB', (total_width, total_height), 'white')
+    draw = ImageDraw.Draw(template)
+    for i in range(count):
+        x_start, y_start = _grid_cell_origin(i, cols, cell_width, cell_height, padding, margin, header_height)
+        draw.rectangle([x_start, y_start, x_start + cell_width, y_start + cell_height],
+                       outline='#cccccc', width=2)
+    return template
+
+
+def _file_sha256(path):
+    """Hex sha256 digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _style_similarity(items):
+    """Cosine similarity between the stored style embeddings of items, as ({item id: row}, matrix)"""
+    embedded = [item for item in items if item.style_embedding]
+    if not embedded:
+        return {}, None
+    # Embeddings are stored normalized, so one matrix product gives every pairwise cosine similarity
+    matrix = np.stack([np.frombuffer(item.style_embedding, dtype=np.float32) for item in embedded])
+    return {item.id: row for row, item in enumerate(embedded)}, matrix @ matrix.T
+
+
+def read_image_bytes(image):
+    """Get the raw bytes of an image given as a file path, bytes, or a readable file-like object"""
+    if isinstance(image, (bytes, bytearray)):
+        return bytes(image)
+    if isinstance(image, (str, os.PathLike)):
+        with open(image, 'rb') as image_file:
+            return image_file.read()
+    image.seek(0)
+    return image.read()
+
+
+def _prepare_for_vision(image_bytes):
+    """Return (mime type, base64 data) for a vision request, downscaled and re-encoded as JPEG when worthwhile"""
+    with Image.open(BytesIO(image_bytes)) as img:
+        # Small PNG/JPEG files are already cheap to send as they are
+        if max(img.size) <= VISION_SKIP_SIDE and img.format in ('PNG', 'JPEG'):
+            return f"image/{img.format.lower()}", base64.b64encode(image_bytes).decode('utf-8')
+
+        scale = min(1.0, VISION_MAX_LONG_SIDE / max(img.size), VISION_MAX_SHORT_SIDE / min(img.size))
+        if scale < 1.0:
+            img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.Resampling.LANCZOS)
+
+        # JPEG has no alpha, so flatten transparent areas onto white like the processed product photos
+        if img.mode in ('RGBA', 'LA', 'P'):
+            rgba = img.convert('RGBA')
+            img = Image.new('RGB', rgba.size, 'white')
+            img.paste(rgba, mask=rgba.getchannel('A'))
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        buffer = BytesIO()
+        img.save(buffer, 'JPEG', quality=VISION_JPEG_QUALITY, optimize=True)
+    return "image/jpeg", base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
+@lru_cache(maxsize=1)
+def get_openai_http_client():
+    """Get the process-wide HTTP client shared by every OpenAI client, so TCP/TLS connections are reused"""
+    return httpx.Client(
+        http2=h2 is not None,
+        timeout=OPENAI_HTTP_TIMEOUT,
+        limits=httpx.Limits(max_keepalive_connections=OPENAI_MAX_KEEPALIVE),
+    )
+
 
 class GeminiImageProcessor:
     """Service class for processing images with Google Gemini API"""
+
+    MODEL = "gemini-2.5-flash-image"
+    # Same image + clothing type gives the same product photo, so skip re-paying for it
+    CACHE_TIMEOUT = 60 * 60 * 24
+    # Bump PROMPT_VERSION whenever PROMPT_TMPL changes so cached results from the old prompt are not reused
+    PROMPT_VERSION = "v1"
+    PROMPT_TMPL = (
+        "Only process the {clothing_type}. Ignore and do not alter any other "
+        "garments or regions such as pants, shoes, skin, hair, or props. "
+        "Isolate the {clothing_type}, remove its background, and place it on a "
+        "pure white background. Smooth out wrinkles and flatten the {clothing_type} "
+        "while keeping its natural shape. Center and crop the frame around only "
+        "the {clothing_type} to look like a professional product photo. "
+        "Also reply with a single JSON object describing only the {clothing_type}: "
+        '{{"type": "top, bottom, outerwear, dress, shoes or accessories", '
+        '"color": "primary color name", "style": "style description", '
+        '"material": "material/fabric type", "pattern": "pattern or solid", '
+        '"occasion": "casual, formal, business, party, sport or evening", '
+        '"season": "spring, summer, fall, winter or all"}}'
+    )
     
     def __init__(self):
         """Initialize Gemini client"""
@@ -53,22 +292,21 @@ class GeminiImageProcessor:
     def process_image_with_gemini(self, image_path, clothing_type):
         """Process image using Gemini API for professional product photo"""
         try:
+            cache_key = f"gemini:{self.MODEL}:{self.PROMPT_VERSION}:{_file_sha256(image_path)}:{clothing_type}"
+            cached_result = cache.get(cache_key)
+            if cached_result is not None:
+                logger.info(f"Gemini cache hit for {clothing_type} image {image_path}")
+                return cached_result
+
             # Load the image
             image_to_edit = Image.open(image_path)
             
             # Define the editing prompt
-            edit_prompt = (
-                f"Only process the {clothing_type}. Ignore and do not alter any other "
-                f"garments or regions such as pants, shoes, skin, hair, or props. "
-                f"Isolate the {clothing_type}, remove its background, and place it on a "
-                f"pure white background. Smooth out wrinkles and flatten the {clothing_type} "
-                f"while keeping its natural shape. Center and crop the frame around only "
-                f"the {clothing_type} to look like a professional product photo."
-            )
+            edit_prompt = self.PROMPT_TMPL.format(clothing_type=clothing_type)
             
             # Call the Gemini API
             response = self.client.models.generate_content(
-                model="gemini-2.5-flash-image",
+                model=self.MODEL,
                 contents=[edit_prompt, image_to_edit]
             )
 
@@ -82,36 +320,41 @@ class GeminiImageProcessor:
             print(f"Total Token Count: {usage.total_token_count}")
             print("---------------------------\n")
             
+            # The clothing analysis comes back as text alongside the edited image
+            parts = response.candidates[0].content.parts
+            clothing_analysis = self._parse_clothing_analysis(
+                ''.join(part.text for part in parts if getattr(part, 'text', None))
+            )
+
             # Process and save the edited image
-            for part in response.candidates[0].content.parts:
+            for part in parts:
                 if part.inline_data is not None:
                     edited_image = Image.open(BytesIO(part.inline_data.data))
                     
-                    # Save to temporary file
-                    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                        edited_image.save(tmp_file.name, 'PNG')
-                        processed_path = tmp_file.name
-                    
-                    # Read the processed image data
-                    with open(processed_path, 'rb') as f:
-                        processed_data = f.read()
+                    # Re-encode as PNG in memory
+                    output_buffer = BytesIO()
+                    edited_image.save(output_buffer, 'PNG')
+                    processed_data = output_buffer.getvalue()
                     
-                    # Clean up
-                    os.remove(processed_path)
-                    
-                    return {
+                    result = {
                         'success': True,
                         'processed_image_data': processed_data,
                         'response_id': 'gemini_processed',
                         'analysis': 'Processed using Gemini API for professional product photo',
+                        'clothing_analysis': clothing_analysis,
                         'method': 'gemini'
                     }
+                    cache.set(cache_key, result, self.CACHE_TIMEOUT)
+                    return result
             
             return {
                 'success': False,
                 'error': 'No processed image returned from Gemini API'
             }
             
+        except GEMINI_TRANSIENT_ERRORS:
+            # Let the caller retry; the task retries these with backoff
+            raise
         except Exception as e:
             logger.error(f"Error processing image with Gemini: {e}")
             return {
@@ -119,23 +362,49 @@ class GeminiImageProcessor:
                 'error': str(e)
             }
 
+    @staticmethod
+    def _parse_clothing_analysis(text):
+        """Extract the clothing analysis JSON object from Gemini's text reply, or None"""
+        start, end = text.find('{'), text.rfind('}')
+        if start == -1 or end < start:
+            return None
+        try:
+            analysis = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to parse clothing analysis from Gemini response: {text}")
+            return None
+        return analysis if isinstance(analysis, dict) else None
+
 
 class OpenAIImageProcessor:
     """Service class for processing images with OpenAI API"""
     
+    PROMPT_TMPL = (
+        "Smooth out wrinkles and flatten the garment. Remove the background and place the garment on a "
+        "pure white background. Make it look like a professional product photo. Maintain the natural shape "
+        "of the clothing. only for {clothing_type} above."
+    )
+    # Part of the analysis cache key; bump it when this class's prompts change so stale results are not reused
+    PROMPT_VERSION = "v1"
+    # Edit prompts for the known clothing types, formatted once at import
+    CLOTHING_PROMPTS = _format_prompts(PROMPT_TMPL, CLOTHING_TYPE_CATEGORIES)
+    
     def __init__(self):
         """Initialize OpenAI client"""
-        api_key = os.getenv('OPENAI_API_KEY')
+        api_key = OPENAI_API_KEY
         if not api_key:
             raise ValueError(
                 "OpenAI API key not found. Please set the OPENAI_API_KEY environment variable. "
                 "Run 'python setup_api_key.py' for setup instructions."
             )
-        self.client = OpenAI(api_key=api_key)
+        self.client = OpenAI(api_key=api_key, http_client=get_openai_http_client())
     
     def generate_clothing_prompt(self, clothing_type):
         """Generate the appropriate prompt based on clothing type"""
-        return f"Smooth out wrinkles and flatten the garment. Remove the background and place the garment on a pure white background. Make it look like a professional product photo. Maintain the natural shape of the clothing. only for {clothing_type} above."
+        prompt = self.CLOTHING_PROMPTS.get(clothing_type)
+        if prompt is None:
+            prompt = self.PROMPT_TMPL.format(clothing_type=clothing_type)
+        return prompt
     
     def encode_image_to_base64(self, image_path):
         """Encode image file to base64 string"""
@@ -146,15 +415,20 @@ class OpenAIImageProcessor:
             logger.error(f"Error encoding image to base64: {e}")
             raise
     
-    def convert_to_png(self, image_path):
-        """Convert image to PNG format for OpenAI API compatibility"""
-        from PIL import Image
-        
-        # Create a temporary PNG file
-        png_path = image_path.rsplit('.', 1)[0] + '_temp.png'
+    def convert_to_png(self, image):
+        """Convert image to PNG format for OpenAI API compatibility
+
+        A path is written to a sibling *_temp.png file whose path is returned; a file-like
+        object is converted in memory and a rewound BytesIO holding the PNG is returned.
+        """
+        if isinstance(image, str):
+            # Create a temporary PNG file
+            png_path = image.rsplit('.', 1)[0] + '_temp.png'
+        else:
+            png_path = BytesIO()
         
         # Open the original image and convert to PNG
-        with Image.open(image_path) as img:
+        with Image.open(image) as img:
             original_mode = img.mode
             logger.info(f"Original image mode: {original_mode}")
             
@@ -192,32 +466,37 @@ class OpenAIImageProcessor:
             
             # Save as PNG
             img.save(png_path, 'PNG')
-            logger.info(f"Saved PNG file: {png_path}")
+            if isinstance(png_path, BytesIO):
+                png_path.seek(0)
+            else:
+                logger.info(f"Saved PNG file: {png_path}")
         
         return png_path
 
-    def analyze_clothing_image(self, image_path, clothing_type):
-        """Analyze the clothing image using ChatGPT and return structured JSON"""
+    def analyze_clothing_image(self, image, clothing_type):
+        """Analyze the clothing image (path, bytes or file-like) using ChatGPT and return structured JSON (cached by image content)"""
         try:
-            # Convert image to PNG format for better compatibility
-            png_path = self.convert_to_png(image_path)
-            
-            # Encode the image to base64
-            with open(png_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-            
-            # Generate the analysis prompt for structured JSON response
-            desired_type_mapping = {
-                'shirt': 'top', 'tshirt': 'top', 'sweater': 'top', 'hoodie': 'top', 'blouse': 'top', 'top': 'top',
-                'jacket': 'outerwear', 'coat': 'outerwear', 'outerwear': 'outerwear',
-                'pants': 'bottom', 'skirt': 'bottom', 'shorts': 'bottom', 'jeans': 'bottom', 'bottom': 'bottom',
-                'dress': 'dress',
-                'shoes': 'shoes', 'sneakers': 'shoes', 'heels': 'shoes', 'boots': 'shoes',
-                'watch': 'accessories', 'belt': 'accessories', 'hat': 'accessories', 'bag': 'accessories', 'accessories': 'accessories'
+            image_bytes = read_image_bytes(image)
+        except OSError as e:
+            logger.error(f"Error analyzing clothing image: {e}")
+            return {
+                'success': False,
+                'error': str(e)
             }
-            desired_type = desired_type_mapping.get((clothing_type or '').lower(), 'accessories')
+        return get_or_compute(
+            image_bytes, clothing_type, "gpt-4o", self.PROMPT_VERSION,
+            lambda: self._analyze_clothing_image(image_bytes, clothing_type)
+        )
+
+    def build_analysis_messages(self, image_bytes, clothing_type):
+        """Build the GPT-4 Vision chat messages asking for a structured JSON analysis of the clothing image"""
+        # Downscale/re-encode to what the vision model actually looks at
+        mime_type, base64_image = _prepare_for_vision(image_bytes)
+
+        # Generate the analysis prompt for structured JSON response
+        desired_type = CLOTHING_TYPE_CATEGORIES.get((clothing_type or '').lower(), 'accessories')
 
-            analysis_prompt = f"""Analyze this image but focus EXCLUSIVELY on the {clothing_type}. 
+        analysis_prompt = f"""Analyze this image but focus EXCLUSIVELY on the {clothing_type}. 
 Ignore all other garments, body parts, or background. If multiple garments are visible, consider only the {clothing_type}. 
 Set the JSON field \"type\" to \"{desired_type}\" exactly.
 
@@ -239,27 +518,32 @@ Focus on accurately identifying FOR THE {clothing_type} ONLY:
 3. Suitable occasions and seasons
 
 Return ONLY the JSON object, no additional text."""
-            
-            # Prepare the message for GPT-4 Vision
-            messages = [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": analysis_prompt
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/png;base64,{base64_image}",
-                                "detail": "high"
-                            }
+
+        # Prepare the message for GPT-4 Vision
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": analysis_prompt
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:{mime_type};base64,{base64_image}",
+                            "detail": "high"
                         }
-                    ]
-                }
-            ]
-            
+                    }
+                ]
+            }
+        ]
+
+    def _analyze_clothing_image(self, image_bytes, clothing_type):
+        """Call ChatGPT to analyze the clothing image"""
+        try:
+            messages = self.build_analysis_messages(image_bytes, clothing_type)
+
             # Call GPT-4 Vision API
             response = self.client.chat.completions.create(
                 model="gpt-4o",
@@ -293,7 +577,6 @@ Return ONLY the JSON object, no additional text."""
                     # Try to extract JSON from markdown code blocks
                     try:
                         # Look for JSON in markdown code blocks
-                        import re
                         json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', analysis_text, re.DOTALL)
                         if json_match:
                             json_str = json_match.group(1)
@@ -345,21 +628,11 @@ Return ONLY the JSON object, no additional text."""
                 'success': False,
                 'error': str(e)
             }
-        finally:
-            # Clean up temporary PNG file
-            if 'png_path' in locals() and os.path.exists(png_path):
-                try:
-                    os.remove(png_path)
-                except Exception as e:
-                    logger.warning(f"Could not remove temporary PNG file {png_path}: {e}")
 
 
     def process_image_with_traditional_method(self, image_path, clothing_type):
         """Process image using traditional image processing techniques"""
         try:
-            from PIL import Image, ImageFilter, ImageEnhance
-            import numpy as np
-            
             # Open the original image
             with Image.open(image_path) as img:
                 # Convert to RGBA for better processing
@@ -373,17 +646,10 @@ Return ONLY the JSON object, no additional text."""
                 # In a more sophisticated implementation, you'd use AI to detect and remove the original background
                 processed_img = img
                 
-                # Save the processed image
-                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                    processed_img.save(tmp_file.name, 'PNG')
-                    processed_path = tmp_file.name
-                
-                # Read the processed image data
-                with open(processed_path, 'rb') as f:
-                    processed_data = f.read()
-                
-                # Clean up
-                os.remove(processed_path)
+                # Encode the processed image as PNG in memory
+                output_buffer = BytesIO()
+                processed_img.save(output_buffer, 'PNG')
+                processed_data = output_buffer.getvalue()
                 
                 return {
                     'success': True,
@@ -406,7 +672,7 @@ Return ONLY the JSON object, no additional text."""
 
     
     def save_processed_image(self, processed_image_data, original_filename):
-        """Save processed image data to a file"""
+        """Wrap processed image data in a ContentFile named after the original image"""
         try:
             # Create a filename for the processed image
             filename_parts = original_filename.rsplit('.', 1)
@@ -426,6 +692,24 @@ Return ONLY the JSON object, no additional text."""
             raise
 
 
+@lru_cache(maxsize=1)
+def get_openai_processor():
+    """Get the shared OpenAIImageProcessor, created on first use"""
+    return OpenAIImageProcessor()
+
+
+@lru_cache(maxsize=1)
+def get_gemini_processor():
+    """Get the shared GeminiImageProcessor, created on first use"""
+    return GeminiImageProcessor()
+
+
+@lru_cache(maxsize=64)
+def get_clothing_prompt(clothing_type):
+    """Get the processing prompt for a clothing type (memoized per type)"""
+    return get_openai_processor().generate_clothing_prompt(clothing_type)
+
+
 class NanobananaMannequinService:
     """Service for generating mannequin images using Nanobanana/Gemini API"""
     
@@ -448,9 +732,6 @@ class NanobananaMannequinService:
             logger.info(f"Starting mannequin generation for {occasion} occasion in {season} season")
             
             # Convert bytes to PIL Image
-            from PIL import Image
-            from io import BytesIO
-            
             composite_image = Image.open(BytesIO(composite_image_data))
             logger.info(f"Composite image loaded: {composite_image.size}, mode: {composite_image.mode}")
             
@@ -512,7 +793,6 @@ class NanobananaMannequinService:
             
         except Exception as e:
             logger.error(f"Error generating mannequin image: {e}")
-            import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
             return {
                 'success': False,
@@ -552,44 +832,55 @@ class BatchOutfitAnalysis(BaseModel):
 class StyleRecommendationService:
     """Service for AI-powered style recommendations"""
     
+    # Part of the wardrobe analysis cache key; bump it when the analysis prompt changes
+    PROMPT_VERSION = "v1"
+    
     def __init__(self):
         """Initialize OpenAI client and LangChain components"""
-        api_key = os.getenv('OPENAI_API_KEY')
+        api_key = OPENAI_API_KEY
         if not api_key:
             raise ValueError(
                 "OpenAI API key not found. Please set the OPENAI_API_KEY environment variable."
             )
-        self.client = OpenAI(api_key=api_key)
+        self.client = OpenAI(api_key=api_key, http_client=get_openai_http_client())
         
         # Initialize LangChain components
         self.llm = ChatOpenAI(
             model="gpt-3.5-turbo",
             temperature=0.3,
             max_tokens=2000,  # Increased for batch analysis
-            api_key=api_key
+            api_key=api_key,
+            http_client=get_openai_http_client()
         )
-        self.output_parser = PydanticOutputParser(pydantic_object=OutfitAnalysis)
         self.batch_output_parser = PydanticOutputParser(pydantic_object=BatchOutfitAnalysis)
     
     def analyze_wardrobe_item(self, wardrobe_item):
-        """Analyze a wardrobe item and extract style information"""
+        """Analyze a wardrobe item and extract style information (cached by image content)"""
+        if not wardrobe_item.processed_image.processed_image:
+            return {
+                'success': False,
+                'error': 'No processed image available for analysis'
+            }
         try:
-            if not wardrobe_item.processed_image.processed_image:
-                return {
-                    'success': False,
-                    'error': 'No processed image available for analysis'
-                }
-            
-            # Get image path
-            image_path = wardrobe_item.processed_image.processed_image.path
-            
-            # Convert to PNG for analysis
-            processor = OpenAIImageProcessor()
-            png_path = processor.convert_to_png(image_path)
-            
-            # Encode image to base64
-            with open(png_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode('utf-8')
+            with wardrobe_item.processed_image.processed_image.open('rb') as image_file:
+                image_bytes = image_file.read()
+        except OSError as e:
+            logger.error(f"Error analyzing wardrobe item: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+        # The prompt depends on the item category, so it is part of the key
+        return get_or_compute(
+            image_bytes, f"style:{wardrobe_item.category}", "gpt-4o", self.PROMPT_VERSION,
+            lambda: self._analyze_wardrobe_item(wardrobe_item, image_bytes)
+        )
+
+    def _analyze_wardrobe_item(self, wardrobe_item, image_bytes):
+        """Call GPT-4 Vision to extract style information for a wardrobe item"""
+        try:
+            # Downscale/re-encode the already-read image to what the vision model actually looks at
+            mime_type, base64_image = _prepare_for_vision(image_bytes)
             
             # Create analysis prompt
             analysis_prompt = f"""Analyze this {wardrobe_item.category} clothing item and provide detailed style information:
@@ -628,7 +919,7 @@ Respond in JSON format:
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/png;base64,{base64_image}",
+                                "url": f"data:{mime_type};base64,{base64_image}",
                                 "detail": "high"
                             }
                         }
@@ -674,13 +965,6 @@ Respond in JSON format:
                 'success': False,
                 'error': str(e)
             }
-        finally:
-            # Clean up temporary PNG file
-            if 'png_path' in locals() and os.path.exists(png_path):
-                try:
-                    os.remove(png_path)
-                except Exception as e:
-                    logger.warning(f"Could not remove temporary PNG file {png_path}: {e}")
     
     def _extract_analysis_from_text(self, text):
         """Extract analysis information from text when JSON parsing fails"""
@@ -698,11 +982,11 @@ Respond in JSON format:
             "raw_analysis": text
         }
     
-    def generate_outfit_recommendations(self, user=None, occasion='casual', season='all', max_outfits=5):
-        """Generate outfit recommendations from wardrobe items"""
+    def generate_outfit_recommendations(self, user=None, occasion='casual', season='all', max_outfits=5, out_stream=None):
+        """Generate outfit recommendations from wardrobe items; if out_stream is given, also write their composite PNG to it"""
         try:
-            # Get available wardrobe items
-            wardrobe_items = WardrobeItem.objects.all()
+            # Get available wardrobe items (with their images, which every outfit render touches)
+            wardrobe_items = WardrobeItem.objects.select_related('processed_image')
             if user is not None:
                 wardrobe_items = wardrobe_items.filter(user=user)
             
@@ -719,11 +1003,13 @@ Respond in JSON format:
                 Q(season=season) | Q(season='all')
             )
             
+            exact_match_count = exact_matches.count()
+            
             logger.info(f"Filtering for occasion='{occasion}', season='{season}'")
-            logger.info(f"Exact matches found: {exact_matches.count()}")
+            logger.info(f"Exact matches found: {exact_match_count}")
             
             # If we don't have enough items, be more flexible but still prioritize matches
-            if exact_matches.count() >= 3:  # Need at least 3 items for good combinations
+            if exact_match_count >= 3:  # Need at least 3 items for good combinations
                 filtered_items = exact_matches
                 logger.info("Using exact matches for filtering")
             else:
@@ -740,25 +1026,32 @@ Respond in JSON format:
                         Q(occasion=occasion) | Q(occasion='casual') | Q(occasion='business') | Q(occasion='all') | Q(occasion=''),
                         Q(season=season) | Q(season='all')
                     )
-                logger.info(f"Using fallback filtering, found {filtered_items.count()} items")
+            
+            # Load the candidate items once; everything below works on these in memory
+            filtered_items = list(filtered_items)
+            logger.info(f"Using {len(filtered_items)} candidate items")
+            style_similarity = _style_similarity(filtered_items)
             
             # Log the selected items for debugging
             for item in filtered_items[:5]:  # Log first 5 items
                 logger.info(f"Selected item: {item.name} - Occasion: {item.occasion}, Season: {item.season}")
             
-            if not filtered_items.exists():
+            if not filtered_items:
                 return {
                     'success': False,
                     'error': f'No items suitable for {occasion} occasion and {season} season'
                 }
             
             # Group items by category
-            tops = filtered_items.filter(category='top')
-            bottoms = filtered_items.filter(category='bottom')
-            shoes = filtered_items.filter(category='shoes')
-            accessories = filtered_items.filter(category='accessories')
-            outerwear = filtered_items.filter(category='outerwear')
-            dresses = filtered_items.filter(category='dress')
+            items_by_category = defaultdict(list)
+            for item in filtered_items:
+                items_by_category[item.category].append(item)
+            tops = items_by_category['top']
+            bottoms = items_by_category['bottom']
+            shoes = items_by_category['shoes']
+            accessories = items_by_category['accessories']
+            outerwear = items_by_category['outerwear']
+            dresses = items_by_category['dress']
             
             # Create outfit combinations
             outfits = []
@@ -799,13 +1092,13 @@ Respond in JSON format:
                     outfit_items = [top, bottom]
                     
                     # Add smart random shoes (avoid duplicates if possible)
-                    random_shoe = self._get_smart_random_item(shoes, base_item=top, avoid_duplicates=used_shoes)
+                    random_shoe = self._get_smart_random_item(shoes, base_item=top, avoid_duplicates=used_shoes, style_similarity=style_similarity)
                     if random_shoe:
                         outfit_items.append(random_shoe)
                         used_shoes.add(random_shoe.id)
                     
                     # Add smart random accessories (avoid duplicates if possible)
-                    random_accessory = self._get_smart_random_item(accessories, base_item=top, avoid_duplicates=used_accessories)
+                    random_accessory = self._get_smart_random_item(accessories, base_item=top, avoid_duplicates=used_accessories, style_similarity=style_similarity)
                     if random_accessory:
                         outfit_items.append(random_accessory)
                         used_accessories.add(random_accessory.id)
@@ -830,14 +1123,14 @@ Respond in JSON format:
                     
                     # Add smart random shoes if available and not already a shoe
                     if item.category != 'shoes':
-                        random_shoe = self._get_smart_random_item(shoes, base_item=item, avoid_duplicates=used_shoes)
+                        random_shoe = self._get_smart_random_item(shoes, base_item=item, avoid_duplicates=used_shoes, style_similarity=style_similarity)
                         if random_shoe:
                             outfit_items.append(random_shoe)
                             used_shoes.add(random_shoe.id)
                     
                     # Add smart random accessories if available and not already an accessory
                     if item.category != 'accessories':
-                        random_accessory = self._get_smart_random_item(accessories, base_item=item, avoid_duplicates=used_accessories)
+                        random_accessory = self._get_smart_random_item(accessories, base_item=item, avoid_duplicates=used_accessories, style_similarity=style_similarity)
                         if random_accessory:
                             outfit_items.append(random_accessory)
                             used_accessories.add(random_accessory.id)
@@ -863,6 +1156,12 @@ Respond in JSON format:
                 'overall_analysis': batch_analysis['overall_analysis']
             }
             
+            if out_stream is not None:
+                composite_result = OutfitImageGenerator().generate_outfit_composite_image(ai_outfits, occasion, season, out_stream=out_stream)
+                result_data['composite_written'] = composite_result['success']
+                if not composite_result['success']:
+                    result_data['composite_error'] = composite_result['error']
+            
             return result_data
             
         except Exception as e:
@@ -876,7 +1175,9 @@ Respond in JSON format:
         """Generate individual flat-lay images for each outfit combination"""
         try:
             # Get outfit recommendations
-            recommendations = self.generate_outfit_recommendations(occasion, season, max_outfits)
+            recommendations = self.generate_outfit_recommendations(
+                occasion=occasion, season=season, max_outfits=max_outfits
+            )
             
             if not recommendations['success']:
                 return recommendations
@@ -898,7 +1199,6 @@ Respond in JSON format:
                 if flatlay_result['success']:
                     individual_images.append({
                         'outfit': outfit,
-                        'image_data': flatlay_result['image_data'],
                         'flatlay_file': flatlay_result['flatlay_image'],
                         'outfit_name': outfit.get('name', f'outfit_{occasion}_{season}')
                     })
@@ -934,21 +1234,15 @@ Respond in JSON format:
             'dresses': [item for item in items if item.category == 'dress'],
         }
     
-    def _get_random_item(self, queryset, max_items=1, avoid_duplicates=None):
-        """Get a random item(s) from a queryset with optional duplicate avoidance"""
-        if not queryset.exists():
-            return None if max_items == 1 else []
-        
-        count = queryset.count()
-        if count == 0:
+    def _get_random_item(self, items, max_items=1, avoid_duplicates=None):
+        """Get a random item(s) from a list of items with optional duplicate avoidance"""
+        items = list(items)
+        if not items:
             return None if max_items == 1 else []
         
         # If we want more items than available, return all
-        if max_items >= count:
-            return list(queryset.all())
-        
-        # Get all items
-        items = list(queryset.all())
+        if max_items >= len(items):
+            return items[0] if max_items == 1 else items
         
         # If we need to avoid duplicates, filter out already used items
         if avoid_duplicates:
@@ -970,13 +1264,12 @@ Respond in JSON format:
         
         return selected_items[0] if max_items == 1 and selected_items else selected_items
     
-    def _get_smart_random_item(self, queryset, base_item=None, avoid_duplicates=None, max_items=1):
+    def _get_smart_random_item(self, items, base_item=None, avoid_duplicates=None, max_items=1, style_similarity=None):
         """Get a random item with some intelligence for better coordination"""
-        if not queryset.exists():
+        items = list(items)
+        if not items:
             return None if max_items == 1 else []
         
-        items = list(queryset.all())
-        
         # If we need to avoid duplicates, filter out already used items
         if avoid_duplicates:
             available_items = [item for item in items if item.id not in avoid_duplicates]
@@ -1006,6 +1299,14 @@ Respond in JSON format:
             # If we found good color matches, use them; otherwise use all available
             if color_matches:
                 available_items = color_matches
+            
+            # Narrow to the stylistically closer half when every candidate has a stored embedding
+            rows, similarity = style_similarity or ({}, None)
+            if similarity is not None and base_item.id in rows and all(item.id in rows for item in available_items):
+                base_row = rows[base_item.id]
+                available_items = sorted(
+                    available_items, key=lambda item: similarity[base_row, rows[item.id]], reverse=True
+                )[:max(max_items, (len(available_items) + 1) // 2)]
         
         # Ensure we don't try to select more items than available
         actual_max = min(max_items, len(available_items))
@@ -1030,6 +1331,13 @@ Respond in JSON format:
                 return True
         return False
     
+    def _store_outfit_image(self, image_data, prefix):
+        """Save a generated outfit PNG to media storage (named by content hash) and return its URL"""
+        name = f"outfits/{prefix}_{hashlib.sha256(image_data).hexdigest()[:32]}.png"
+        if not default_storage.exists(name):
+            name = default_storage.save(name, ContentFile(image_data))
+        return default_storage.url(name)
+    
     def _process_single_outfit(self, outfit_data):
         """Process a single outfit to generate flat-lay and mannequin images"""
         outfit, occasion, season, index = outfit_data
@@ -1043,38 +1351,43 @@ Respond in JSON format:
             # Generate individual flat-lay image
             flatlay_result = image_generator.generate_outfit_flatlay_image(outfit, occasion, season)
             
+            flatlay_image_data = None
             if flatlay_result['success']:
-                # Encode flat-lay image data as base64
-                import base64
-                outfit['flatlay_image_data'] = base64.b64encode(flatlay_result['image_data']).decode('utf-8')
+                # Read the flat-lay PNG once; it is needed for storage and for mannequin generation
+                with flatlay_result['flatlay_image'] as flatlay_file:
+                    flatlay_image_data = flatlay_file.read()
+                
+                # Serve the flat-lay from media storage instead of inlining it as base64
+                outfit['flatlay_image_url'] = self._store_outfit_image(flatlay_image_data, 'flatlay')
                 logger.info(f"Generated flat-lay image for outfit {index+1}")
             else:
                 logger.warning(f"Failed to generate flat-lay for outfit {index+1}: {flatlay_result['error']}")
-                outfit['flatlay_image_data'] = None
+                outfit['flatlay_image_url'] = None
             
             # Generate mannequin image from the flat-lay
             if flatlay_result['success']:
                 try:
                     mannequin_result = nanobanana_service.generate_mannequin_image(
-                        flatlay_result['image_data'], occasion, season
+                        flatlay_image_data, occasion, season
                     )
                     
                     if mannequin_result['success']:
-                        # Encode mannequin image data as base64
-                        outfit['mannequin_image_data'] = base64.b64encode(mannequin_result['mannequin_image_data']).decode('utf-8')
+                        outfit['mannequin_image_url'] = self._store_outfit_image(
+                            mannequin_result['mannequin_image_data'], 'mannequin'
+                        )
                         outfit['mannequin_analysis'] = mannequin_result['analysis']
                         logger.info(f"Generated mannequin image for outfit {index+1}")
                     else:
                         logger.warning(f"Failed to generate mannequin for outfit {index+1}: {mannequin_result['error']}")
-                        outfit['mannequin_image_data'] = None
+                        outfit['mannequin_image_url'] = None
                         outfit['mannequin_analysis'] = None
                         
                 except Exception as e:
                     logger.error(f"Error generating mannequin for outfit {index+1}: {e}")
-                    outfit['mannequin_image_data'] = None
+                    outfit['mannequin_image_url'] = None
                     outfit['mannequin_analysis'] = None
             else:
-                outfit['mannequin_image_data'] = None
+                outfit['mannequin_image_url'] = None
                 outfit['mannequin_analysis'] = None
                 
             return outfit, index
@@ -1082,8 +1395,8 @@ Respond in JSON format:
         except Exception as e:
             logger.error(f"Error processing outfit {index+1}: {e}")
             # Ensure outfit has the required fields even if processing fails
-            outfit['flatlay_image_data'] = None
-            outfit['mannequin_image_data'] = None
+            outfit['flatlay_image_url'] = None
+            outfit['mannequin_image_url'] = None
             outfit['mannequin_analysis'] = None
             return outfit, index
     
@@ -1127,8 +1440,8 @@ Respond in JSON format:
                     logger.error(f"Failed to process outfit {index+1}: {e}")
                     # Keep the original outfit with null image data
                     processed_outfits[index] = outfits[index]
-                    processed_outfits[index]['flatlay_image_data'] = None
-                    processed_outfits[index]['mannequin_image_data'] = None
+                    processed_outfits[index]['flatlay_image_url'] = None
+                    processed_outfits[index]['mannequin_image_url'] = None
                     processed_outfits[index]['mannequin_analysis'] = None
                     completed_count += 1
         
@@ -1136,82 +1449,6 @@ Respond in JSON format:
         logger.info(f"Completed concurrent processing of {len(outfits)} outfits in {total_time:.2f}s")
         return processed_outfits
     
-    def _analyze_outfit_with_ai(self, outfit, occasion, season):
-        """Use AI to analyze and score an outfit combination using LangChain"""
-        try:
-            # Create outfit description
-            outfit_description = self._describe_outfit(outfit)
-            
-            # Create the prompt template with format instructions
-            prompt_template = ChatPromptTemplate.from_messages([
-                ("system", "You are a professional fashion stylist and outfit analyst. Analyze outfits using all available information including colors, materials, style descriptions, occasions, seasons, and style tags. Provide detailed, structured feedback."),
-                ("user", """Analyze this outfit combination for a {occasion} occasion in {season} season:
-
-{outfit_description}
-
-The outfit description includes detailed information about each item including:
-- Primary and secondary colors
-- Clothing types (shirt, pants, dress, etc.)
-- Materials and fabrics
-- Style descriptions and tags
-- Suitable occasions and seasons
-- Brand information and sizing
-- Color palettes
-
-Please evaluate the outfit considering:
-
-1. OCCASION APPROPRIATENESS: Is this suitable for the specified {occasion} occasion? This is CRITICAL - the outfit must match the occasion requirements. Consider the individual item occasions and how they complement each other.
-2. SEASON SUITABILITY: Is this appropriate for the {season} season? This is CRITICAL - the outfit must match the season requirements. Check if the materials, colors, and styles are seasonally appropriate.
-3. STYLE COHESION: How well do the pieces work together based on their style descriptions, materials, and overall aesthetic?
-4. COLOR HARMONY: Do the colors work well together? Consider the primary colors, color palettes, and any color schemes.
-5. MATERIAL COMPATIBILITY: Do the materials and fabrics complement each other?
-6. STYLE CONSISTENCY: Do the style tags and descriptions create a cohesive look?
-7. OVERALL CONFIDENCE: Rate the overall outfit quality and appropriateness for the {occasion} occasion in {season} season (0-1)
-
-IMPORTANT: The outfit must be suitable for the {occasion} occasion and {season} season. If it doesn't match these requirements, provide a low confidence score and suggest improvements.
-
-Provide specific feedback based on the detailed item information provided.
-
-{format_instructions}""")
-            ])
-            
-            # Create the chain
-            chain = prompt_template | self.llm | self.output_parser
-            
-            # Invoke the chain with the outfit data
-            analysis_result = chain.invoke({
-                "occasion": occasion,
-                "season": season,
-                "outfit_description": outfit_description,
-                "format_instructions": self.output_parser.get_format_instructions()
-            })
-            
-            # Combine outfit data with AI analysis
-            outfit.update({
-                'style_description': analysis_result.style_description,
-                'color_scheme': analysis_result.color_scheme,
-                'style_tags': analysis_result.style_tags,
-                'confidence_score': analysis_result.confidence_score,
-                'style_notes': analysis_result.style_notes,
-                'improvement_suggestions': analysis_result.improvement_suggestions
-            })
-            
-            return outfit
-            
-        except Exception as e:
-            logger.error(f"Error analyzing outfit with AI: {e}")
-            
-            # Fallback analysis in case of error
-            outfit.update({
-                'style_description': f"Stylish {occasion} outfit for {season}",
-                'color_scheme': [item.color for item in outfit['items']],
-                'style_tags': [occasion, season],
-                'confidence_score': 0.6,
-                'style_notes': f"Error during analysis: {str(e)}",
-                'improvement_suggestions': []
-            })
-            return outfit
-    
     def _analyze_all_outfits_with_ai(self, outfits, occasion, season, max_outfits=5):
         """Use AI to analyze and rank all outfits in a single batch prompt"""
         try:
@@ -1394,32 +1631,48 @@ Please:
     
     def save_outfit_recommendation(self, outfit_data, user=None):
         """Save an outfit recommendation to the database"""
+        result = self.save_outfit_recommendations([outfit_data], user=user)
+        if not result['success']:
+            return result
+        return {
+            'success': True,
+            'outfit': result['outfits'][0]
+        }
+
+    def save_outfit_recommendations(self, outfits_data, user=None):
+        """Save several outfit recommendations with one INSERT for outfits and one for their items"""
         try:
-            # Create outfit recommendation
-            outfit = OutfitRecommendation.objects.create(
-                name=outfit_data['name'],
-                occasion=outfit_data['occasion'],
-                season=outfit_data['season'],
-                style_description=outfit_data.get('style_description', ''),
-                color_scheme=outfit_data.get('color_scheme', []),
-                style_tags=outfit_data.get('style_tags', []),
-                confidence_score=outfit_data.get('confidence_score', 0.5),
-                user=user
-            )
-            
-            # Add items to outfit
-            for item in outfit_data['items']:
-                OutfitItem.objects.create(
-                    outfit=outfit,
-                    item=item,
-                    category=item.category,
-                    match_score=outfit_data.get('confidence_score', 0.5),
-                    style_notes=outfit_data.get('style_notes', '')
-                )
+            with transaction.atomic():
+                outfits = OutfitRecommendation.objects.bulk_create([
+                    OutfitRecommendation(
+                        name=outfit_data['name'],
+                        occasion=outfit_data['occasion'],
+                        season=outfit_data['season'],
+                        style_description=outfit_data.get('style_description', ''),
+                        color_scheme=outfit_data.get('color_scheme', []),
+                        style_tags=outfit_data.get('style_tags', []),
+                        confidence_score=outfit_data.get('confidence_score', 0.5),
+                        user=user
+                    )
+                    for outfit_data in outfits_data
+                ], batch_size=BULK_BATCH_SIZE)
+
+                # Add items to outfits
+                OutfitItem.objects.bulk_create([
+                    OutfitItem(
+                        outfit=outfit,
+                        item=item,
+                        category=item.category,
+                        match_score=outfit_data.get('confidence_score', 0.5),
+                        style_notes=outfit_data.get('style_notes', '')
+                    )
+                    for outfit, outfit_data in zip(outfits, outfits_data)
+                    for item in outfit_data['items']
+                ], batch_size=BULK_BATCH_SIZE)
             
             return {
                 'success': True,
-                'outfit': outfit
+                'outfits': outfits
             }
             
         except Exception as e:
@@ -1429,6 +1682,26 @@ Please:
                 'error': str(e)
             }
     
+    def _compute_style_embedding(self, wardrobe_item, analysis):
+        """Embed the item's analysed style attributes once; returns normalized float32 bytes, or None on failure"""
+        style_text = "; ".join(filter(None, [
+            wardrobe_item.category,
+            analysis.get('primary_color') or wardrobe_item.color,
+            analysis.get('material'),
+            analysis.get('style'),
+            ", ".join(analysis.get('style_tags') or []),
+            ", ".join(analysis.get('suitable_occasions') or []),
+            ", ".join(analysis.get('suitable_seasons') or []),
+        ]))
+        try:
+            response = self.client.embeddings.create(model=EMBEDDING_MODEL, input=style_text)
+        except Exception as e:
+            logger.error(f"Error computing style embedding: {e}")
+            return None
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return (vector / norm).tobytes() if norm else None
+    
     def update_wardrobe_item_analysis(self, wardrobe_item):
         """Update wardrobe item with AI analysis"""
         try:
@@ -1442,6 +1715,7 @@ Please:
                 wardrobe_item.style_description = analysis.get('style', '')
                 wardrobe_item.color_palette = analysis.get('color_palette', [])
                 wardrobe_item.style_tags = analysis.get('style_tags', [])
+                wardrobe_item.style_embedding = self._compute_style_embedding(wardrobe_item, analysis)
                 
                 # Update occasion and season if provided
                 if analysis.get('suitable_occasions'):
@@ -1451,8 +1725,12 @@ Please:
                 if analysis.get('suitable_seasons'):
                     # Use the first suitable season or keep current
                     wardrobe_item.season = analysis['suitable_seasons'][0]
-                
-                wardrobe_item.save()
+
+                # Only write the analysed columns (updated_at must be listed for auto_now to apply)
+                wardrobe_item.save(update_fields=[
+                    'style_description', 'color_palette', 'style_tags', 'style_embedding',
+                    'occasion', 'season', 'updated_at'
+                ])
                 
                 return {
                     'success': True,
@@ -1469,6 +1747,12 @@ Please:
             }
 
 
+@lru_cache(maxsize=1)
+def get_style_service():
+    """Get the shared StyleRecommendationService, created on first use"""
+    return StyleRecommendationService()
+
+
 class ImageValidationService:
     """Service for validating uploaded images"""
     
@@ -1480,9 +1764,10 @@ class ImageValidationService:
         """Validate uploaded image file"""
         errors = []
         
-        # Check file size
+        # Check file size before reading anything from the upload
         if uploaded_file.size > cls.MAX_FILE_SIZE:
             errors.append(f"File size too large. Maximum size is {cls.MAX_FILE_SIZE / (1024*1024):.1f}MB")
+            return errors
         
         # Check file extension
         file_extension = os.path.splitext(uploaded_file.name.lower())[1]
@@ -1491,16 +1776,32 @@ class ImageValidationService:
         
         # Check if file is actually an image (basic check)
         try:
-            from PIL import Image
-            with Image.open(uploaded_file) as img:
-                img.verify()
-            # Reset file pointer
+            header = uploaded_file.read(32)
             uploaded_file.seek(0)
+
+            # Only fall back to a full PIL parse when the header is not a known image signature
+            if not cls._has_image_signature(header):
+                with Image.open(uploaded_file) as img:
+                    img.verify()
+                # Reset file pointer
+                uploaded_file.seek(0)
         except Exception:
             errors.append("Invalid image file")
-        
+
         return errors
 
+    @staticmethod
+    def _has_image_signature(header):
+        """Check the leading bytes of a file against known image magic numbers"""
+        return (
+            header.startswith(b'\xff\xd8\xff') or          # JPEG
+            header.startswith(b'\x89PNG\r\n\x1a\n') or      # PNG
+            header.startswith((b'GIF87a', b'GIF89a')) or    # GIF
+            (header[:4] == b'RIFF' and header[8:12] == b'WEBP') or  # WebP
+            (header.startswith(b'BM') and                   # BMP: "BM" alone also matches text, so check the DIB header
+             int.from_bytes(header[14:18], 'little') in BMP_DIB_HEADER_SIZES)
+        )
+
 
 class OutfitImageGenerator:
     """Service for generating individual flat-lay images of outfit combinations"""
@@ -1544,17 +1845,12 @@ class OutfitImageGenerator:
             canvas_width = 400
             canvas_height = 300
             
-            # Create the flat-lay canvas
-            canvas = Image.new('RGB', (canvas_width, canvas_height), 'white')
-            
+            # Create the flat-lay canvas as a raw pixel array so items can be blitted in one pass
+            canvas_array = np.full((canvas_height, canvas_width, 3), 255, dtype=np.uint8)
+
             # Item positioning for natural flat-lay arrangement
             item_positions = self._calculate_flatlay_positions(all_items, canvas_width, canvas_height)
-            
-            # Try to load a font, fallback to default if not available
-            try:
-                font_small = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 12)
-            except:
-                font_small = ImageFont.load_default()
+            tiles = []
             
             # Place each item in its calculated position
             for i, (item, position) in enumerate(zip(all_items, item_positions)):
@@ -1563,53 +1859,54 @@ class OutfitImageGenerator:
                 # Try to get the item image
                 try:
                     item_image = None
-                    image_path = None
                     
-                    # Try processed image first
-                    if hasattr(item, 'processed_image') and item.processed_image:
-                        if hasattr(item.processed_image, 'processed_image') and item.processed_image.processed_image:
-                            image_path = item.processed_image.processed_image.path
-                            if os.path.exists(image_path):
-                                item_image = Image.open(image_path)
-                        
-                        # Try original image if processed image failed
-                        if item_image is None and hasattr(item.processed_image, 'original_image') and item.processed_image.original_image:
-                            image_path = item.processed_image.original_image.path
-                            if os.path.exists(image_path):
-                                item_image = Image.open(image_path)
+                    # Processed image first, then the original (resolved on the model)
+                    image_path = getattr(item, 'best_image_path', None)
+                    if image_path:
+                        with Image.open(image_path) as source_image:
+                            # JPEGs can be decoded at a reduced scale directly (no-op for other formats)
+                            source_image.draft('RGB', (size, size))
+                            # reducing_gap box-reduces large photos in C before the final LANCZOS pass
+                            item_image = source_image.resize((size, size), Image.Resampling.LANCZOS, reducing_gap=2.0)
                     
                     # Create placeholder if no image was loaded
                     if item_image is None:
-                        item_image = Image.new('RGB', (size, size), '#f0f0f0')
-                        draw_placeholder = ImageDraw.Draw(item_image)
-                        draw_placeholder.text((size//8, size//2), item.name[:8], fill='#999999', font=font_small)
+                        item_image = _placeholder(size, item.name[:8])
                         
                 except Exception as e:
                     logger.error(f"Error loading image for item {item.name}: {e}")
                     # Create a placeholder image
-                    item_image = Image.new('RGB', (size, size), '#f0f0f0')
-                    draw_placeholder = ImageDraw.Draw(item_image)
-                    draw_placeholder.text((size//8, size//2), item.name[:8], fill='#999999', font=font_small)
-                
-                # Resize the item image
-                item_image = item_image.resize((size, size), Image.Resampling.LANCZOS)
-                
-                # Paste the item image onto the canvas
-                canvas.paste(item_image, (x, y), item_image if item_image.mode == 'RGBA' else None)
-            
+                    item_image = _placeholder(size, item.name[:8])
+
+                # Only RGBA items carry a paste mask; everything else is pasted opaque
+                if item_image.mode != 'RGBA':
+                    item_image = item_image.convert('RGB').convert('RGBA')
+                tiles.append(np.asarray(item_image))
+
+            # Blit all item tiles onto the canvas
+            _blit_tiles(
+                canvas_array,
+                np.stack(tiles),
+                np.array([position[0] for position in item_positions], dtype=np.int64),
+                np.array([position[1] for position in item_positions], dtype=np.int64),
+                np.array([position[2] for position in item_positions], dtype=np.int64),
+            )
+            canvas = Image.fromarray(canvas_array)
+
             # Save the flat-lay image
-            output_buffer = BytesIO()
-            canvas.save(output_buffer, format='PNG', quality=95)
-            output_buffer.seek(0)
+            # Spool the PNG in memory (rolling over to disk for large images) instead of copying bytes around
+            output_file = tempfile.SpooledTemporaryFile(max_size=2 * 1024 * 1024)
+            canvas.save(output_file, format='PNG', compress_level=OUTFIT_PNG_COMPRESS_LEVEL)
+            output_file.seek(0)
             
-            # Create a Django ContentFile
+            # Wrap it in a Django File; callers that need raw bytes read from it
             outfit_name = outfit.get('name', f'outfit_{occasion}_{season}').replace(' ', '_').lower()
-            flatlay_file = ContentFile(output_buffer.getvalue(), name=f'flatlay_{outfit_name}.png')
+            flatlay_file = File(output_file, name=f'flatlay_{outfit_name}.png')
             
             return {
                 'success': True,
                 'flatlay_image': flatlay_file,
-                'image_data': output_buffer.getvalue(),
+                'canvas': canvas,
                 'outfit': outfit
             }
             
@@ -1620,8 +1917,11 @@ class OutfitImageGenerator:
                 'error': str(e)
             }
 
-    def generate_outfit_composite_image(self, outfits, occasion='casual', season='all'):
-        """Generate a single composite image showing multiple flat-lay outfit arrangements"""
+    def generate_outfit_composite_image(self, outfits, occasion='casual', season='all', out_stream=None):
+        """Generate a single composite image showing multiple flat-lay outfit arrangements
+
+        When out_stream is given the PNG is written straight into it and no bytes are kept in the result.
+        """
         try:
             if not outfits:
                 return {
@@ -1629,6 +1929,25 @@ class OutfitImageGenerator:
                     'error': 'No outfits provided for composite image generation'
                 }
             
+            # A single outfit needs no grid or title - return its flat-lay directly
+            if len(outfits) == 1:
+                flatlay_result = self.generate_outfit_flatlay_image(outfits[0], occasion, season)
+                if flatlay_result['success']:
+                    with flatlay_result['flatlay_image'] as flatlay_file:
+                        if out_stream is not None:
+                            flatlay_file.seek(0)
+                            shutil.copyfileobj(flatlay_file, out_stream, STREAM_CHUNK_SIZE)
+                            return {'success': True, 'outfits_shown': 1}
+                        image_data = flatlay_file.read()
+                    return {
+                        'success': True,
+                        'composite_image': ContentFile(image_data, name=f'outfit_composite_{occasion}_{season}.png'),
+                        'image_data': image_data,
+                        'outfits_shown': 1
+                    }
+                # The grid path would only render this same flat-lay again, so report its failure directly
+                return flatlay_result
+            
             # Limit to reasonable number of outfits for display
             outfits_to_show = outfits[:6]  # Show max 6 outfits
             
@@ -1650,74 +1969,73 @@ class OutfitImageGenerator:
             padding = 15
             margin = 20
             
-            # Calculate total composite image size
-            total_width = (flatlay_width * cols) + (padding * (cols - 1)) + (margin * 2)
-            total_height = (flatlay_height * rows) + (padding * (rows - 1)) + (margin * 2) + 35  # Compact title space only
-            
-            # Create the composite image
-            composite = Image.new('RGB', (total_width, total_height), 'white')
+            # Start from the cached grid template, which already has every outfit border drawn
+            composite = _grid_template(
+                len(outfits_to_show), cols, rows, flatlay_width, flatlay_height, padding, margin, 35  # Compact title space only
+            ).copy()
+            total_width = composite.width
             draw = ImageDraw.Draw(composite)
             
-            # Try to load a font
-            try:
-                font_title = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
-                font_small = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 12)
-            except:
-                font_title = ImageFont.load_default()
-                font_small = ImageFont.load_default()
+            # Load the (cached) fonts
+            font_title = _load_font(FONT_BOLD_PATH, 24)
+            font_small = _load_font(FONT_REGULAR_PATH, 12)
             
             # Draw title - more compact
             title = f"Outfit Recommendations - {occasion.title()} {season.title()}"
-            title_bbox = draw.textbbox((0, 0), title, font=font_title)
-            title_width = title_bbox[2] - title_bbox[0]
-            title_x = (total_width - title_width) // 2
-            draw.text((title_x, margin // 2), title, fill='#333333', font=font_title)
+            # Let PIL centre the title horizontally via the anchor instead of measuring it first
+            draw.text((total_width // 2, margin // 2), title, fill='#333333', font=font_title, anchor='ma')
+            
+            # Area of a flat-lay inside its 2px template border
+            inner_box = (2, 2, flatlay_width - 1, flatlay_height - 1)
+            
+            # Cells are opaque copies, so write them straight into the pixel array (no blending needed)
+            composite_array = np.array(composite)
             
             # Draw each outfit as a flat-lay
             for i, outfit in enumerate(outfits_to_show):
-                row = i // cols
-                col = i % cols
-                
                 # Calculate position for this outfit's flat-lay - more compact
-                x_start = margin + (col * (flatlay_width + padding))
-                y_start = margin + 35 + (row * (flatlay_height + padding))
+                x_start, y_start = _grid_cell_origin(i, cols, flatlay_width, flatlay_height, padding, margin, 35)
                 
                 # Create individual flat-lay for this outfit
                 flatlay_result = self.generate_outfit_flatlay_image(outfit, occasion, season)
                 
                 if flatlay_result['success']:
-                    # Load the flat-lay image
-                    flatlay_image = Image.open(BytesIO(flatlay_result['image_data']))
-                    # Resize to fit our grid
-                    flatlay_image = flatlay_image.resize((flatlay_width, flatlay_height), Image.Resampling.LANCZOS)
-                    
-                    # Paste onto composite
-                    composite.paste(flatlay_image, (x_start, y_start))
-                    
-                    # Draw outfit border
-                    draw.rectangle([x_start, y_start, x_start + flatlay_width, y_start + flatlay_height], 
-                                 outline='#cccccc', width=2)
+                    # Use the rendered flat-lay canvas directly; the encoded file is not needed here
+                    flatlay_result['flatlay_image'].close()
+                    flatlay_image = flatlay_result['canvas']
+                    # Resize to fit our grid (flat-lays are normally rendered at cell size already)
+                    if flatlay_image.size != (flatlay_width, flatlay_height):
+                        flatlay_image = flatlay_image.resize((flatlay_width, flatlay_height), Image.Resampling.LANCZOS)
                 else:
                     # Create placeholder if flat-lay generation failed
-                    placeholder = Image.new('RGB', (flatlay_width, flatlay_height), '#f0f0f0')
-                    draw_placeholder = ImageDraw.Draw(placeholder)
+                    flatlay_image = Image.new('RGB', (flatlay_width, flatlay_height), '#f0f0f0')
+                    draw_placeholder = ImageDraw.Draw(flatlay_image)
                     draw_placeholder.text((flatlay_width//4, flatlay_height//2), f'Outfit {i+1}', fill='#999999', font=font_small)
-                    composite.paste(placeholder, (x_start, y_start))
-                    draw.rectangle([x_start, y_start, x_start + flatlay_width, y_start + flatlay_height], 
-                                 outline='#cccccc', width=2)
+                
+                # Copy into the composite, leaving the template border untouched
+                left, top, right, bottom = inner_box
+                composite_array[y_start + top:y_start + bottom, x_start + left:x_start + right] = (
+                    np.asarray(flatlay_image.convert('RGB'))[top:bottom, left:right]
+                )
+            composite = Image.fromarray(composite_array)
+            
+            # Let PIL encode straight into the caller's stream instead of buffering the bytes here
+            if out_stream is not None:
+                composite.save(out_stream, format='PNG', compress_level=OUTFIT_PNG_COMPRESS_LEVEL)
+                return {'success': True, 'outfits_shown': len(outfits_to_show)}
             
             # Save the composite image
             output_buffer = BytesIO()
-            composite.save(output_buffer, format='PNG', quality=95)
-            output_buffer.seek(0)
+            composite.save(output_buffer, format='PNG', compress_level=OUTFIT_PNG_COMPRESS_LEVEL)
+            image_data = output_buffer.getvalue()
             
             # Create a Django ContentFile
-            composite_file = ContentFile(output_buffer.getvalue(), name=f'outfit_composite_{occasion}_{season}.png')
+            composite_file = ContentFile(image_data, name=f'outfit_composite_{occasion}_{season}.png')
             
             return {
                 'success': True,
                 'composite_image': composite_file,
-                'image_data': output_buffer.getvalue(),
+                'image_data': image_data,
                 'outfits_shown': len(outfits_to_show)
             }
             
@@ -1790,7 +2108,6 @@ class OutfitImageGenerator:
             
             # Create a tight cluster in the center
             center_x, center_y = canvas_width // 2, canvas_height // 2
-            import random
             random.seed(42)  # For consistent positioning
             
             for i in range(item_count):
@@ -0,0 +1,291 @@
+import logging
+import time
+from types import MappingProxyType
+
+from celery import shared_task
+from celery.signals import worker_process_init
+
+from .models import ProcessedImage, WardrobeItem
+from .services import GEMINI_TRANSIENT_ERRORS, get_gemini_processor, get_openai_http_client, get_openai_processor, get_style_service
+
+logger = logging.getLogger(__name__)
+
+# Map AI-detected types to wardrobe category
+_TYPE_MAPPING = MappingProxyType({
+    'top': 'top',
+    'bottom': 'bottom',
+    'shoes': 'shoes',
+    'watch': 'accessories',
+    'accessories': 'accessories',
+    'outerwear': 'outerwear',
+    'dress': 'dress',
+})
+
+# Map color to wardrobe color choices
+_COLOR_MAPPING = MappingProxyType({
+    'black': 'black',
+    'white': 'white',
+    'gray': 'gray',
+    'grey': 'gray',
+    'navy': 'navy',
+    'blue': 'blue',
+    'red': 'red',
+    'green': 'green',
+    'yellow': 'yellow',
+    'orange': 'orange',
+    'purple': 'purple',
+    'pink': 'pink',
+    'brown': 'brown',
+    'beige': 'beige',
+    'cream': 'cream'
+})
+
+# Map occasion to wardrobe occasion choices
+_OCCASION_MAPPING = MappingProxyType({
+    'casual': 'casual',
+    'formal': 'formal',
+    'business': 'business',
+    'party': 'party',
+    'sport': 'sport',
+    'evening': 'evening'
+})
+
+# Map season to wardrobe season choices
+_SEASON_MAPPING = MappingProxyType({
+    'spring': 'spring',
+    'summer': 'summer',
+    'fall': 'fall',
+    'autumn': 'fall',
+    'winter': 'winter',
+    'all': 'all'
+})
+
+# Map the user's selected clothing type to wardrobe category
+_CLOTHING_TYPE_CATEGORY = MappingProxyType({
+    'jacket': 'outerwear',
+    'shirt': 'top',
+    'tshirt': 'top',
+    'pants': 'bottom',
+    'dress': 'dress',
+    'sweater': 'top',
+    'hoodie': 'top',
+    'coat': 'outerwear',
+    'blouse': 'top',
+    'skirt': 'bottom',
+    'shorts': 'bottom',
+    'shoes': 'shoes',
+    'other': 'accessories',
+})
+
+
+@worker_process_init.connect
+def init_worker_processors(**kwargs):
+    """Create this worker process's API clients up front so the first task doesn't pay for it"""
+    # Connection pools must not be shared across fork, so drop anything inherited from the parent
+    get_gemini_processor.cache_clear()
+    get_openai_processor.cache_clear()
+    get_style_service.cache_clear()
+    get_openai_http_client.cache_clear()
+    for get_processor in (get_gemini_processor, get_openai_processor):
+        try:
+            get_processor()
+        except ValueError as e:
+            # Missing API key; the task reports it per image
+            logger.warning(f"Could not initialize processor in worker: {e}")
+
+
+@shared_task(
+    bind=True,
+    max_retries=3,
+    autoretry_for=GEMINI_TRANSIENT_ERRORS,
+    retry_backoff=True,
+    queue='gemini',
+)
+def process_image_task(self, image_id):
+    """Process an uploaded image with Gemini API and create its wardrobe item"""
+    # Claim the image in the database so only one worker processes it, whichever host it runs on
+    claimed = ProcessedImage.objects.filter(id=image_id, status='pending').update(status='processing')
+    if claimed != 1:
+        logger.info(f"Image {image_id} is not pending (already processed or in progress), skipping")
+        return
+
+    try:
+        processed_image = ProcessedImage.objects.get(id=image_id)
+
+        # Initialize Gemini processor
+        try:
+            processor = get_gemini_processor()
+        except ValueError as e:
+            logger.error(f"Gemini API key error: {e}")
+            processed_image.status = 'failed'
+            processed_image.error_message = str(e)
+            processed_image.save()
+            return
+
+        # Get the full path to the original image
+        original_image_path = processed_image.original_image.path
+
+        # Process the image with Gemini
+        result = processor.process_image_with_gemini(original_image_path, processed_image.clothing_type)
+
+        if result['success']:
+            # Save the processed image
+            openai_processor = get_openai_processor()
+            processed_file = openai_processor.save_processed_image(
+                result['processed_image_data'],
+                processed_image.original_image.name
+            )
+
+            # Update the model; the file is written to storage once, straight from memory
+            processed_image.processed_image.save(processed_file.name, processed_file, save=False)
+            processed_image.status = 'completed'
+            processed_image.openai_response_id = result.get('response_id')
+            processed_image.gpt4_analysis = result.get('analysis', '')
+            processed_image.save()
+
+            # Automatically create wardrobe item
+            create_wardrobe_item_automatically(processed_image, result.get('clothing_analysis'))
+
+            logger.info(f"Successfully processed image {image_id}")
+        else:
+            processed_image.status = 'failed'
+            processed_image.error_message = result.get('error', 'Unknown error')
+            processed_image.save()
+
+            logger.error(f"Failed to process image {image_id}: {result.get('error')}")
+
+    except Exception as e:
+        # Transient Gemini failures are retried by Celery with backoff until retries run out
+        if isinstance(e, GEMINI_TRANSIENT_ERRORS) and self.request.retries < self.max_retries:
+            # Hand the image back so the retry can claim it again
+            ProcessedImage.objects.filter(id=image_id, status='processing').update(status='pending')
+            raise
+        logger.error(f"Error processing image {image_id}: {e}")
+        try:
+            processed_image = ProcessedImage.objects.get(id=image_id)
+            processed_image.status = 'failed'
+            processed_image.error_message = str(e)
+            processed_image.save()
+        except Exception as save_error:
+            logger.error(f"Could not mark image {image_id} as failed: {save_error}")
+
+
+@shared_task(queue='openai')
+def analyze_wardrobe_item_task(item_id):
+    """Run the AI style analysis for a wardrobe item and return the updated fields"""
+    try:
+        item = WardrobeItem.objects.get(id=item_id)
+    except WardrobeItem.DoesNotExist:
+        return {'success': False, 'error': 'Wardrobe item not found'}
+
+    result = get_style_service().update_wardrobe_item_analysis(item)
+    if not result['success']:
+        return {'success': False, 'error': result['error']}
+
+    return {
+        'success': True,
+        'updated_item': {
+            'style_description': item.style_description,
+            'style_tags': item.style_tags,
+            'color_palette': item.color_palette
+        }
+    }
+
+
+def create_wardrobe_item_automatically(processed_image, analysis_data=None):
+    """Automatically create a wardrobe item from processed image, analysing it with ChatGPT if needed"""
+    try:
+        # Check if wardrobe item already exists
+        if hasattr(processed_image, 'wardrobe_item'):
+            logger.info(f"Wardrobe item already exists for image {processed_image.id}")
+            return
+
+        try:
+            if analysis_data is not None:
+                # Reuse the analysis returned alongside the Gemini product photo
+                analysis_result = {'success': True, 'analysis': analysis_data}
+            else:
+                # Analyze the image with ChatGPT to get structured data
+                openai_processor = get_openai_processor()
+                analysis_result = openai_processor.analyze_clothing_image(
+                    processed_image.original_image.path, 
+                    processed_image.clothing_type
+                )
+
+            if analysis_result['success']:
+                analysis_data = analysis_result['analysis']
+
+                # Prefer the user's selected clothing_type for category
+                user_selected_category = _CLOTHING_TYPE_CATEGORY.get(processed_image.clothing_type, 'accessories')
+
+                ai_type = (analysis_data.get('type') or '').lower().strip()
+                ai_category = _TYPE_MAPPING.get(ai_type)
+
+                # Use AI category only if it exists and matches the user's high-level category; otherwise keep user's selection
+                category = ai_category if ai_category == user_selected_category else user_selected_category
+                ai_color = (analysis_data.get('color') or '').lower()
+                color = _COLOR_MAPPING.get(ai_color, ai_color)
+                occasion = _OCCASION_MAPPING.get((analysis_data.get('occasion') or '').lower(), 'casual')
+                season = _SEASON_MAPPING.get((analysis_data.get('season') or '').lower(), 'all')
+                material = analysis_data.get('material', 'unknown')
+                style = analysis_data.get('style', 'casual')
+
+                # Generate a name; base it on the resolved category to avoid mismatched labels
+                resolved_type_for_name = ai_type if _TYPE_MAPPING.get(ai_type) == category else processed_image.clothing_type
+                name = (
+                    f"{(color or 'unknown').title()} {(resolved_type_for_name or 'item').title()} "
+                    f"{time.strftime('%Y%m%d_%H%M', time.gmtime())}"
+                )
+
+                # Create wardrobe item with AI analysis data
+                wardrobe_item = WardrobeItem.objects.create(
+                    user=processed_image.user,
+                    processed_image=processed_image,
+                    name=name,
+                    category=category,
+                    color=color,
+                    material=material,
+                    occasion=occasion,
+                    season=season,
+                    style_description=style
+                )
+
+                logger.info(f"Successfully created wardrobe item {wardrobe_item.id} with AI analysis for image {processed_image.id}")
+
+            else:
+                # Fallback to default creation if AI analysis fails
+                logger.warning(f"AI analysis failed for image {processed_image.id}: {analysis_result.get('error')}")
+                _create_wardrobe_item_fallback(processed_image)
+
+        except Exception as e:
+            logger.error(f"Error in AI analysis for image {processed_image.id}: {e}")
+            _create_wardrobe_item_fallback(processed_image)
+
+    except Exception as e:
+        logger.error(f"Error creating wardrobe item for image {processed_image.id}: {e}")
+
+
+def _create_wardrobe_item_fallback(processed_image):
+    """Fallback method to create wardrobe item with default values"""
+    try:
+        # Get category from clothing type
+        category = _CLOTHING_TYPE_CATEGORY.get(processed_image.clothing_type, 'accessories')
+
+        # Generate a name based on clothing type and timestamp
+        name = f"{processed_image.get_clothing_type_display()} {time.strftime('%Y%m%d_%H%M', time.gmtime())}"
+
+        # Create wardrobe item with default values
+        wardrobe_item = WardrobeItem.objects.create(
+            user=processed_image.user,
+            processed_image=processed_image,
+            name=name,
+            category=category,
+            color='other',  # Default color
+            occasion='casual',  # Default occasion
+            season='all'  # Default season
+        )
+
+        logger.info(f"Successfully created wardrobe item {wardrobe_item.id} with fallback method for image {processed_image.id}")
+
+    except Exception as e:
+        logger.error(f"Error in fallback wardrobe item creation for image {processed_image.id}: {e}")
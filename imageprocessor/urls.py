@@ -26,6 +26,7 @@ urlpatterns = [
     path('api/toggle-favorite/<int:item_id>/', views.toggle_favorite_item, name='toggle_favorite_item'),
     path('api/analyze-item/<int:item_id>/', views.analyze_wardrobe_item, name='analyze_wardrobe_item'),
     path('api/rate-outfit/<int:outfit_id>/', views.rate_outfit, name='rate_outfit'),
+    path('api/task-status/<str:task_id>/', views.task_status, name='task_status'),
 
     # Accounts
     path('accounts/register/', views.register, name='register'),
@@ -1,12 +1,18 @@
 import os
+import json
 import logging
+from itertools import groupby
+from operator import attrgetter
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse, HttpResponseRedirect
+from django.http import JsonResponse, HttpResponseRedirect, HttpResponseNotModified
 from django.contrib import messages
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 from django.utils.decorators import method_decorator
+from django.utils import timezone
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
@@ -15,14 +21,26 @@ from django.shortcuts import redirect
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
+from celery.result import AsyncResult
+from celery.states import FAILURE, READY_STATES, SUCCESS
 
 from .models import ProcessedImage, WardrobeItem, OutfitRecommendation, OutfitItem
-from .services import OpenAIImageProcessor, ImageValidationService, StyleRecommendationService, NanobananaMannequinService
+from .services import ImageValidationService, NanobananaMannequinService, get_clothing_prompt, get_style_service
+from .tasks import analyze_wardrobe_item_task, process_image_task
 from .forms import WardrobeItemForm, OutfitRecommendationForm, OutfitSearchForm, WardrobeItemSearchForm, ConvertToWardrobeForm
 
 logger = logging.getLogger(__name__)
 
+# Session key listing the task ids a user queued; sessions live in the DB, so every web process can check them
+SESSION_TASKS_KEY = 'task_ids'
+# Only the most recent task ids are kept in the session
+MAX_SESSION_TASKS = 20
+
+# How long browsers may reuse a finished task's status response
+TASK_RESULT_MAX_AGE = 60 * 60
+
 
 class ImageUploadView(LoginRequiredMixin, View):
     """View for uploading and processing images"""
@@ -54,260 +72,27 @@ class ImageUploadView(LoginRequiredMixin, View):
                     messages.error(request, error)
                 return render(request, 'imageprocessor/upload.html')
             
-            # Create ProcessedImage instance
-            processed_image = ProcessedImage.objects.create(
-                user=request.user,
-                clothing_type=clothing_type,
-                original_image=uploaded_file,
-                processing_prompt=OpenAIImageProcessor().generate_clothing_prompt(clothing_type),
-                status='pending'
-            )
-            
-            # Process the image asynchronously (in a real app, use Celery)
-            self.process_image_async(processed_image.id)
+            with transaction.atomic():
+                # Create ProcessedImage instance
+                processed_image = ProcessedImage.objects.create(
+                    user=request.user,
+                    clothing_type=clothing_type,
+                    original_image=uploaded_file,
+                    processing_prompt=get_clothing_prompt(clothing_type),
+                    status='pending'
+                )
+                
+                # Process the image in a Celery worker so the request returns immediately,
+                # but only once the row is committed and visible to the worker
+                transaction.on_commit(lambda: process_image_task.delay(processed_image.id))
             
             messages.success(request, 'Image uploaded successfully! Processing will begin shortly.')
             return HttpResponseRedirect(reverse('imageprocessor:result', args=[processed_image.id]))
             
         except Exception as e:
-            logger.error(f"Error in ImageUploadView: {e}")
+            logger.error("Error in ImageUploadView: %s", e, exc_info=True)
             messages.error(request, 'An error occurred while uploading the image.')
             return render(request, 'imageprocessor/upload.html')
-    
-    def process_image_async(self, image_id):
-        """Process image with Gemini API (simplified async processing)"""
-        try:
-            processed_image = ProcessedImage.objects.get(id=image_id)
-            processed_image.status = 'processing'
-            processed_image.save()
-            
-            # Initialize Gemini processor
-            try:
-                from .services import GeminiImageProcessor
-                processor = GeminiImageProcessor()
-            except ValueError as e:
-                logger.error(f"Gemini API key error: {e}")
-                processed_image.status = 'failed'
-                processed_image.error_message = str(e)
-                processed_image.save()
-                return
-            
-            # Get the full path to the original image
-            original_image_path = processed_image.original_image.path
-            
-            # Process the image with Gemini
-            result = processor.process_image_with_gemini(original_image_path, processed_image.clothing_type)
-            
-            if result['success']:
-                # Save the processed image
-                from .services import OpenAIImageProcessor
-                openai_processor = OpenAIImageProcessor()
-                processed_file = openai_processor.save_processed_image(
-                    result['processed_image_data'],
-                    processed_image.original_image.name
-                )
-                
-                # Update the model
-                processed_image.processed_image = processed_file
-                processed_image.status = 'completed'
-                processed_image.openai_response_id = result.get('response_id')
-                processed_image.gpt4_analysis = result.get('analysis', '')
-                processed_image.save()
-                
-                # Automatically create wardrobe item
-                self.create_wardrobe_item_automatically(processed_image)
-                
-                logger.info(f"Successfully processed image {image_id}")
-            else:
-                processed_image.status = 'failed'
-                processed_image.error_message = result.get('error', 'Unknown error')
-                processed_image.save()
-                
-                logger.error(f"Failed to process image {image_id}: {result.get('error')}")
-                
-        except Exception as e:
-            logger.error(f"Error processing image {image_id}: {e}")
-            try:
-                processed_image = ProcessedImage.objects.get(id=image_id)
-                processed_image.status = 'failed'
-                processed_image.error_message = str(e)
-                processed_image.save()
-            except:
-                pass
-    
-    def create_wardrobe_item_automatically(self, processed_image):
-        """Automatically create a wardrobe item from processed image using ChatGPT analysis"""
-        try:
-            # Check if wardrobe item already exists
-            if hasattr(processed_image, 'wardrobe_item'):
-                logger.info(f"Wardrobe item already exists for image {processed_image.id}")
-                return
-            
-            # Analyze the image with ChatGPT to get structured data
-            try:
-                openai_processor = OpenAIImageProcessor()
-                analysis_result = openai_processor.analyze_clothing_image(
-                    processed_image.original_image.path, 
-                    processed_image.clothing_type
-                )
-                
-                if analysis_result['success']:
-                    analysis_data = analysis_result['analysis']
-                    
-                    # Map types to wardrobe category
-                    type_mapping = {
-                        'top': 'top',
-                        'bottom': 'bottom', 
-                        'shoes': 'shoes',
-                        'watch': 'accessories',
-                        'accessories': 'accessories',
-                        'outerwear': 'outerwear',
-                        'dress': 'dress',
-                    }
-                    
-                    # Map color to wardrobe color choices
-                    color_mapping = {
-                        'black': 'black',
-                        'white': 'white',
-                        'gray': 'gray',
-                        'grey': 'gray',
-                        'navy': 'navy',
-                        'blue': 'blue',
-                        'red': 'red',
-                        'green': 'green',
-                        'yellow': 'yellow',
-                        'orange': 'orange',
-                        'purple': 'purple',
-                        'pink': 'pink',
-                        'brown': 'brown',
-                        'beige': 'beige',
-                        'cream': 'cream'
-                    }
-                    
-                    # Map occasion to wardrobe occasion choices
-                    occasion_mapping = {
-                        'casual': 'casual',
-                        'formal': 'formal',
-                        'business': 'business',
-                        'party': 'party',
-                        'sport': 'sport',
-                        'evening': 'evening'
-                    }
-                    
-                    # Map season to wardrobe season choices
-                    season_mapping = {
-                        'spring': 'spring',
-                        'summer': 'summer',
-                        'fall': 'fall',
-                        'autumn': 'fall',
-                        'winter': 'winter',
-                        'all': 'all'
-                    }
-                    
-                    # Prefer the user's selected clothing_type for category
-                    user_selected_category = {
-                        'jacket': 'outerwear',
-                        'shirt': 'top',
-                        'tshirt': 'top',
-                        'pants': 'bottom',
-                        'dress': 'dress',
-                        'sweater': 'top',
-                        'hoodie': 'top',
-                        'coat': 'outerwear',
-                        'blouse': 'top',
-                        'skirt': 'bottom',
-                        'shorts': 'bottom',
-                        'shoes': 'shoes',
-                        'other': 'accessories',
-                    }.get(processed_image.clothing_type, 'accessories')
-
-                    ai_type = (analysis_data.get('type') or '').lower().strip()
-                    ai_category = type_mapping.get(ai_type)
-
-                    # Use AI category only if it exists and matches the user's high-level category; otherwise keep user's selection
-                    category = ai_category if ai_category == user_selected_category else user_selected_category
-                    color = color_mapping.get(analysis_data.get('color', '').lower(), analysis_data.get('color', '').lower())
-                    occasion = occasion_mapping.get(analysis_data.get('occasion', '').lower(), 'casual')
-                    season = season_mapping.get(analysis_data.get('season', '').lower(), 'all')
-                    material = analysis_data.get('material', 'unknown')
-                    style = analysis_data.get('style', 'casual')
-                    
-                    # Generate a name; base it on the resolved category to avoid mismatched labels
-                    from django.utils import timezone
-                    timestamp = timezone.now().strftime('%Y%m%d_%H%M')
-                    resolved_type_for_name = ai_type if type_mapping.get(ai_type) == category else processed_image.clothing_type
-                    name = f"{color.title()} {resolved_type_for_name.title()} {timestamp}"
-                    
-                    # Create wardrobe item with AI analysis data
-                    wardrobe_item = WardrobeItem.objects.create(
-                        user=processed_image.user,
-                        processed_image=processed_image,
-                        name=name,
-                        category=category,
-                        color=color,
-                        material=material,
-                        occasion=occasion,
-                        season=season,
-                        style_description=style
-                    )
-                    
-                    logger.info(f"Successfully created wardrobe item {wardrobe_item.id} with AI analysis for image {processed_image.id}")
-                    
-                else:
-                    # Fallback to default creation if AI analysis fails
-                    logger.warning(f"AI analysis failed for image {processed_image.id}: {analysis_result.get('error')}")
-                    self._create_wardrobe_item_fallback(processed_image)
-                    
-            except Exception as e:
-                logger.error(f"Error in AI analysis for image {processed_image.id}: {e}")
-                self._create_wardrobe_item_fallback(processed_image)
-            
-        except Exception as e:
-            logger.error(f"Error creating wardrobe item for image {processed_image.id}: {e}")
-    
-    def _create_wardrobe_item_fallback(self, processed_image):
-        """Fallback method to create wardrobe item with default values"""
-        try:
-            # Map clothing types to wardrobe categories
-            category_mapping = {
-                'jacket': 'outerwear',
-                'shirt': 'top',
-                'tshirt': 'top',
-                'pants': 'bottom',
-                'dress': 'dress',
-                'sweater': 'top',
-                'hoodie': 'top',
-                'coat': 'outerwear',
-                'blouse': 'top',
-                'skirt': 'bottom',
-                'shorts': 'bottom',
-                'shoes': 'shoes',
-                'other': 'accessories',
-            }
-            
-            # Get category from clothing type
-            category = category_mapping.get(processed_image.clothing_type, 'accessories')
-            
-            # Generate a name based on clothing type and timestamp
-            from django.utils import timezone
-            timestamp = timezone.now().strftime('%Y%m%d_%H%M')
-            name = f"{processed_image.get_clothing_type_display()} {timestamp}"
-            
-            # Create wardrobe item with default values
-            wardrobe_item = WardrobeItem.objects.create(
-                user=processed_image.user,
-                processed_image=processed_image,
-                name=name,
-                category=category,
-                color='other',  # Default color
-                occasion='casual',  # Default occasion
-                season='all'  # Default season
-            )
-            
-            logger.info(f"Successfully created wardrobe item {wardrobe_item.id} with fallback method for image {processed_image.id}")
-            
-        except Exception as e:
-            logger.error(f"Error in fallback wardrobe item creation for image {processed_image.id}: {e}")
 
 
 class ImageResultView(LoginRequiredMixin, View):
@@ -331,7 +116,7 @@ class ImageListView(LoginRequiredMixin, View):
     
     def get(self, request):
         """Display list of all processed images"""
-        processed_images = ProcessedImage.objects.filter(user=request.user)
+        processed_images = ProcessedImage.objects.filter(user=request.user).select_related('wardrobe_item')
         
         context = {
             'processed_images': processed_images,
@@ -360,16 +145,29 @@ class ImageDetailView(LoginRequiredMixin, View):
 def check_processing_status(request, image_id):
     """API endpoint to check processing status"""
     try:
-        processed_image = get_object_or_404(ProcessedImage, id=image_id, user=request.user)
-        
-        return JsonResponse({
-            'status': processed_image.status,
-            'is_complete': processed_image.is_processing_complete(),
-            'error_message': processed_image.error_message,
-            'processed_image_url': processed_image.processed_image.url if processed_image.processed_image else None,
-        })
+        # Polled every few seconds, so fetch only the columns the response needs
+        row = ProcessedImage.objects.filter(id=image_id, user=request.user).values(
+            'status', 'error_message', 'processed_image'
+        ).first()
+        if row is None:
+            return JsonResponse({'error': 'Not found'}, status=404)
+        
+        etag = quote_etag(f"{row['status']}:{row['processed_image'] or ''}")
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            is_complete = row['status'] == 'completed' and bool(row['processed_image'])
+            response = JsonResponse({
+                'status': row['status'],
+                'is_complete': is_complete,
+                'error_message': row['error_message'],
+                'processed_image_url': default_storage.url(row['processed_image']) if is_complete else None,
+            })
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
     except Exception as e:
-        logger.error(f"Error checking processing status: {e}")
+        logger.error("Error checking processing status: %s", e, exc_info=True)
         return JsonResponse({'error': 'Internal server error'}, status=500)
 
 
@@ -381,7 +179,11 @@ class WardrobeListView(LoginRequiredMixin, View):
     def get(self, request):
         """Display wardrobe items with search and filter options"""
         search_form = WardrobeItemSearchForm(request.GET)
-        wardrobe_items = WardrobeItem.objects.filter(user=request.user)
+        # Load only the columns the list cards show, skipping the heavy analysis text/JSON fields
+        wardrobe_items = WardrobeItem.objects.filter(user=request.user).select_related('processed_image').only(
+            'id', 'name', 'category', 'color', 'occasion', 'season', 'brand', 'is_favorite',
+            'processed_image__processed_image',
+        )
         
         # Apply filters
         if search_form.is_valid():
@@ -396,6 +198,7 @@ class WardrobeListView(LoginRequiredMixin, View):
             
             if search_form.cleaned_data.get('search'):
                 search_term = search_form.cleaned_data['search']
+                # On PostgreSQL these ILIKEs use the pg_trgm indexes from migration 0008
                 wardrobe_items = wardrobe_items.filter(
                     Q(name__icontains=search_term) |
                     Q(brand__icontains=search_term) |
@@ -405,18 +208,18 @@ class WardrobeListView(LoginRequiredMixin, View):
             if search_form.cleaned_data.get('favorites_only'):
                 wardrobe_items = wardrobe_items.filter(is_favorite=True)
         
-        # Group items by category for better display
-        items_by_category = {}
-        for item in wardrobe_items:
-            category = item.get_category_display()
-            if category not in items_by_category:
-                items_by_category[category] = []
-            items_by_category[category].append(item)
+        # Group items by category for better display (one query, sorted in SQL)
+        items_list = list(wardrobe_items.order_by('category', 'name'))
+        category_labels = dict(WardrobeItem.CATEGORY_CHOICES)
+        items_by_category = {
+            category_labels.get(category, category): list(items)
+            for category, items in groupby(items_list, key=attrgetter('category'))
+        }
         
         context = {
             'search_form': search_form,
             'items_by_category': items_by_category,
-            'total_items': wardrobe_items.count(),
+            'total_items': len(items_list),
         }
         
         return render(request, 'imageprocessor/wardrobe_list.html', context)
@@ -478,16 +281,19 @@ class ConvertToWardrobeView(LoginRequiredMixin, View):
     
     def get(self, request, image_id):
         """Display conversion form"""
-        processed_image = get_object_or_404(ProcessedImage, id=image_id, user=request.user)
+        processed_image = get_object_or_404(
+            ProcessedImage.objects.select_related('wardrobe_item'), id=image_id, user=request.user
+        )
         
         if processed_image.status != 'completed':
             messages.error(request, 'Image must be processed before adding to wardrobe.')
             return HttpResponseRedirect(reverse('image_detail', args=[image_id]))
         
         # Check if already converted
-        if hasattr(processed_image, 'wardrobe_item'):
+        wardrobe_item = getattr(processed_image, 'wardrobe_item', None)
+        if wardrobe_item is not None:
             messages.info(request, 'This image is already in your wardrobe.')
-            return HttpResponseRedirect(reverse('wardrobe_item_detail', args=[processed_image.wardrobe_item.id]))
+            return HttpResponseRedirect(reverse('wardrobe_item_detail', args=[wardrobe_item.id]))
         
         form = ConvertToWardrobeForm()
         form.fields['processed_image'].initial = processed_image
@@ -524,7 +330,7 @@ class ConvertToWardrobeView(LoginRequiredMixin, View):
                 return HttpResponseRedirect(reverse('wardrobe_item_detail', args=[wardrobe_item.id]))
                 
             except Exception as e:
-                logger.error(f"Error creating wardrobe item: {e}")
+                logger.error("Error creating wardrobe item: %s", e, exc_info=True)
                 messages.error(request, 'Error adding item to wardrobe. Please try again.')
         
         context = {
@@ -544,8 +350,6 @@ class OutfitRecommendationView(LoginRequiredMixin, View):
         """Display outfit recommendation form and results"""
         search_form = OutfitSearchForm(request.GET)
         outfits = []
-        composite_image_data = None
-        mannequin_image_data = None
         overall_analysis = None
         
         if search_form.is_valid():
@@ -554,7 +358,7 @@ class OutfitRecommendationView(LoginRequiredMixin, View):
             max_outfits = search_form.cleaned_data.get('max_outfits', 5)
             
             try:
-                style_service = StyleRecommendationService()
+                style_service = get_style_service()
                 result = style_service.generate_outfit_recommendations(
                     user=request.user,
                     occasion=occasion,
@@ -567,30 +371,29 @@ class OutfitRecommendationView(LoginRequiredMixin, View):
                     overall_analysis = result.get('overall_analysis')
                     
                     # Debug logging
-                    logger.info(f"Result keys: {result.keys()}")
-                    logger.info(f"Generated {len(outfits)} outfits with individual images")
+                    logger.info("Result keys: %s", result.keys())
+                    logger.info("Generated %d outfits with individual images", len(outfits))
                     
-                    # Log image data status for each outfit
+                    # Log image status for each outfit
                     for i, outfit in enumerate(outfits):
-                        has_flatlay = outfit.get('flatlay_image_data') is not None
-                        has_mannequin = outfit.get('mannequin_image_data') is not None
-                        logger.info(f"Outfit {i+1}: name={outfit.get('name', 'Unknown')}, flatlay={has_flatlay}, mannequin={has_mannequin}")
-                        logger.info(f"Outfit {i+1} keys: {list(outfit.keys())}")
+                        has_flatlay = outfit.get('flatlay_image_url') is not None
+                        has_mannequin = outfit.get('mannequin_image_url') is not None
+                        logger.info("Outfit %d: name=%s, flatlay=%s, mannequin=%s", i + 1, outfit.get('name', 'Unknown'), has_flatlay, has_mannequin)
+                        logger.info("Outfit %d keys: %s", i + 1, outfit.keys())
                     
                     messages.success(request, f'Generated {len(outfits)} outfit recommendations!')
                 else:
-                    logger.error(f"Outfit generation failed: {result['error']}")
+                    logger.error("Outfit generation failed: %s", result['error'])
                     messages.error(request, result['error'])
                     
             except Exception as e:
-                logger.error(f"Error generating outfit recommendations: {e}")
+                logger.error("Error generating outfit recommendations: %s", e, exc_info=True)
                 messages.error(request, 'Error generating outfit recommendations. Please try again.')
         
         # Convert outfits to JSON for JavaScript consumption
-        import json
         outfits_json = json.dumps(outfits, default=str) if outfits else '[]'
-        logger.info(f"Outfits JSON length: {len(outfits_json)}")
-        logger.info(f"First 500 chars of outfits JSON: {outfits_json[:500]}")
+        logger.info("Outfits JSON length: %d", len(outfits_json))
+        logger.info("First 500 chars of outfits JSON: %.500s", outfits_json)
         
         context = {
             'search_form': search_form,
@@ -607,10 +410,18 @@ class OutfitRecommendationView(LoginRequiredMixin, View):
         
         if outfit_data:
             try:
-                import json
                 outfit_json = json.loads(outfit_data)
                 
-                style_service = StyleRecommendationService()
+                style_service = get_style_service()
+                
+                # A JSON array saves a whole set of recommendations in one go
+                if isinstance(outfit_json, list):
+                    result = style_service.save_outfit_recommendations(outfit_json, user=request.user)
+                    if result['success']:
+                        messages.success(request, f"{len(result['outfits'])} outfits saved successfully!")
+                        return JsonResponse({'success': True, 'outfit_ids': [outfit.id for outfit in result['outfits']]})
+                    return JsonResponse({'success': False, 'error': result['error']})
+                
                 result = style_service.save_outfit_recommendation(outfit_json, user=request.user)
                 
                 if result['success']:
@@ -620,7 +431,7 @@ class OutfitRecommendationView(LoginRequiredMixin, View):
                     return JsonResponse({'success': False, 'error': result['error']})
                     
             except Exception as e:
-                logger.error(f"Error saving outfit: {e}")
+                logger.error("Error saving outfit: %s", e, exc_info=True)
                 return JsonResponse({'success': False, 'error': str(e)})
         
         return JsonResponse({'success': False, 'error': 'No outfit data provided'})
@@ -645,7 +456,9 @@ class SavedOutfitsView(LoginRequiredMixin, View):
     
     def get(self, request):
         """Display saved outfits"""
-        outfits = OutfitRecommendation.objects.filter(user=request.user).order_by('-created_at')
+        outfits = OutfitRecommendation.objects.filter(user=request.user).prefetch_related(
+            'items__processed_image'
+        ).order_by('-created_at')
         
         # Apply filters if provided
         occasion = request.GET.get('occasion')
@@ -681,7 +494,7 @@ def toggle_favorite_item(request, item_id):
             'is_favorite': item.is_favorite
         })
     except Exception as e:
-        logger.error(f"Error toggling favorite item: {e}")
+        logger.error("Error toggling favorite item: %s", e, exc_info=True)
         return JsonResponse({'success': False, 'error': str(e)})
 
 
@@ -689,54 +502,76 @@ def toggle_favorite_item(request, item_id):
 @csrf_exempt
 @require_http_methods(["POST"])
 def analyze_wardrobe_item(request, item_id):
-    """Analyze wardrobe item with AI"""
+    """Queue AI analysis of a wardrobe item; poll task_status for the result"""
     try:
         item = get_object_or_404(WardrobeItem, id=item_id, user=request.user)
         
-        style_service = StyleRecommendationService()
-        result = style_service.update_wardrobe_item_analysis(item)
-        
-        if result['success']:
-            return JsonResponse({
-                'success': True,
-                'message': 'Item analyzed successfully!',
-                'updated_item': {
-                    'style_description': item.style_description,
-                    'style_tags': item.style_tags,
-                    'color_palette': item.color_palette
-                }
-            })
-        else:
-            return JsonResponse({'success': False, 'error': result['error']})
+        task = analyze_wardrobe_item_task.delay(item.id)
+        # Remember who started the task so only they can read its result
+        request.session[SESSION_TASKS_KEY] = (request.session.get(SESSION_TASKS_KEY, []) + [task.id])[-MAX_SESSION_TASKS:]
+        
+        return JsonResponse({'success': True, 'task_id': task.id}, status=202)
             
     except Exception as e:
-        logger.error(f"Error analyzing wardrobe item: {e}")
+        logger.error("Error analyzing wardrobe item: %s", e, exc_info=True)
         return JsonResponse({'success': False, 'error': str(e)})
 
 
+@login_required
+@require_http_methods(["GET"])
+def task_status(request, task_id):
+    """API endpoint to check the state of a background task"""
+    if task_id not in request.session.get(SESSION_TASKS_KEY, ()):
+        return JsonResponse({'error': 'Not found'}, status=404)
+    
+    task = AsyncResult(task_id)
+    state = task.state
+    ready = state in READY_STATES
+    
+    # A finished task's result never changes, so repeat polls can be answered from the browser cache / with a 304
+    etag = quote_etag(f"{task_id}:{state}")
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        data = {'task_id': task_id, 'state': state, 'ready': ready}
+        if state == SUCCESS:
+            data['result'] = task.result
+        elif state == FAILURE:
+            data['result'] = {'success': False, 'error': str(task.result)}
+        response = JsonResponse(data)
+    response['ETag'] = etag
+    if ready:
+        patch_cache_control(response, private=True, max_age=TASK_RESULT_MAX_AGE)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
 @login_required
 @csrf_exempt
 @require_http_methods(["POST"])
 def rate_outfit(request, outfit_id):
     """Rate an outfit recommendation"""
     try:
-        outfit = get_object_or_404(OutfitRecommendation, id=outfit_id, user=request.user)
         rating = int(request.POST.get('rating', 0))
-        
-        if 1 <= rating <= 5:
-            outfit.rating = rating
-            outfit.save()
-            
-            return JsonResponse({
-                'success': True,
-                'rating': rating,
-                'message': 'Outfit rated successfully!'
-            })
-        else:
+        if not 1 <= rating <= 5:
             return JsonResponse({'success': False, 'error': 'Rating must be between 1 and 5'})
+        
+        # Single UPDATE of just the rating (update() bypasses auto_now, so bump updated_at here)
+        updated = OutfitRecommendation.objects.filter(id=outfit_id, user=request.user).update(
+            rating=rating, updated_at=timezone.now()
+        )
+        if not updated:
+            return JsonResponse({'success': False, 'error': 'Outfit not found'}, status=404)
+        
+        return JsonResponse({
+            'success': True,
+            'rating': rating,
+            'message': 'Outfit rated successfully!'
+        })
             
     except Exception as e:
-        logger.error(f"Error rating outfit: {e}")
+        logger.error("Error rating outfit: %s", e, exc_info=True)
         return JsonResponse({'success': False, 'error': str(e)})
 
 
@@ -10,22 +10,22 @@ sys.path.append('/home/ponir/Documents/clients/jake/ai-projects/stylerecomend/st
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
 django.setup()
 
-from imageprocessor.services import StyleRecommendationService
+from imageprocessor.services import get_style_service
 
 def save_composite_image():
     print("=== Generating and Saving Composite Image ===")
     
     try:
-        service = StyleRecommendationService()
-        result = service.generate_outfit_recommendations('casual', 'all', 2)
+        service = get_style_service()
+        # Stream the composite PNG straight into the file rather than holding its bytes in memory
+        with open('composite_test.png', 'wb') as f:
+            result = service.generate_outfit_recommendations(occasion='casual', season='all', max_outfits=2, out_stream=f)
+            size = f.tell()
         
-        if result['success'] and 'composite_image_data' in result:
-            # Save the composite image to a file
-            with open('composite_test.png', 'wb') as f:
-                f.write(result['composite_image_data'])
-            print(f"Composite image saved as 'composite_test.png' ({len(result['composite_image_data'])} bytes)")
+        if result['success'] and result.get('composite_written'):
+            print(f"Composite image saved as 'composite_test.png' ({size} bytes)")
         else:
-            print(f"Failed to generate composite: {result.get('error', 'Unknown error')}")
+            print(f"Failed to generate composite: {result.get('error') or result.get('composite_error', 'Unknown error')}")
     except Exception as e:
         print(f"Exception: {e}")
         import traceback
@@ -5,14 +5,38 @@ Setup script for Style Recommend Django application
 import os
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
-def run_command(command):
-    """Run a command and return the result"""
+# Interpreter inside the project's virtual environment
+VENV_DIR = os.path.join('..', 'env')
+VENV_PYTHON = os.path.join(VENV_DIR, 'Scripts', 'python.exe') if os.name == 'nt' else os.path.join(VENV_DIR, 'bin', 'python')
+
+def run_command(args):
+    """Run a command (argv list, no shell) with its output streamed to the terminal"""
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-        return True, result.stdout
-    except subprocess.CalledProcessError as e:
-        return False, e.stderr
+        subprocess.run(args, check=True)
+        return True, None
+    except (subprocess.CalledProcessError, OSError) as e:
+        return False, str(e)
+
+def check_api_key():
+    """Warn if the OpenAI API key is not configured"""
+    print("🔑 Checking OpenAI API key...")
+    openai_key = os.getenv('OPENAI_API_KEY')
+    if not openai_key:
+        print("⚠️  Warning: OPENAI_API_KEY environment variable not set!")
+        print("   Please set your OpenAI API key:")
+        print("   export OPENAI_API_KEY=your_api_key_here")
+        print("   Or create a .env file with: OPENAI_API_KEY=your_api_key_here")
+    else:
+        print("✅ OpenAI API key found")
+
+def create_media_directories():
+    """Create the upload directories under media/"""
+    print("📁 Creating media directories...")
+    os.makedirs('media/original_images', exist_ok=True)
+    os.makedirs('media/processed_images', exist_ok=True)
+    print("✅ Media directories created")
 
 def main():
     print("🚀 Setting up Style Recommend Django Application")
@@ -24,47 +48,39 @@ def main():
         sys.exit(1)
     
     # Check if virtual environment exists
-    if not os.path.exists('../env'):
+    if not os.path.exists(VENV_DIR):
         print("📦 Creating virtual environment...")
-        success, output = run_command('cd .. && python -m venv env')
+        success, output = run_command([sys.executable, '-m', 'venv', VENV_DIR])
         if not success:
             print(f"❌ Failed to create virtual environment: {output}")
             sys.exit(1)
         print("✅ Virtual environment created")
     
-    # Install requirements
+    # Skip pip's self-version check on every invocation
+    os.environ['PIP_DISABLE_PIP_VERSION_CHECK'] = '1'
+    
+    # Install requirements in the background; the local setup steps don't depend on it
     print("📥 Installing requirements...")
-    success, output = run_command('source ../env/bin/activate && pip install -r requirements.txt')
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pip_install = executor.submit(
+            run_command, [VENV_PYTHON, '-m', 'pip', 'install', '--require-virtualenv', '-r', 'requirements.txt']
+        )
+        create_media_directories()
+        check_api_key()
+        success, output = pip_install.result()
     if not success:
         print(f"❌ Failed to install requirements: {output}")
         sys.exit(1)
     print("✅ Requirements installed")
     
-    # Run migrations
+    # Run migrations (needs Django from the installed requirements)
     print("🗄️ Running database migrations...")
-    success, output = run_command('source ../env/bin/activate && python manage.py migrate')
+    success, output = run_command([VENV_PYTHON, 'manage.py', 'migrate'])
     if not success:
         print(f"❌ Failed to run migrations: {output}")
         sys.exit(1)
     print("✅ Database migrations completed")
     
-    # Check for OpenAI API key
-    print("🔑 Checking OpenAI API key...")
-    openai_key = os.getenv('OPENAI_API_KEY')
-    if not openai_key:
-        print("⚠️  Warning: OPENAI_API_KEY environment variable not set!")
-        print("   Please set your OpenAI API key:")
-        print("   export OPENAI_API_KEY=your_api_key_here")
-        print("   Or create a .env file with: OPENAI_API_KEY=your_api_key_here")
-    else:
-        print("✅ OpenAI API key found")
-    
-    # Create media directories
-    print("📁 Creating media directories...")
-    os.makedirs('media/original_images', exist_ok=True)
-    os.makedirs('media/processed_images', exist_ok=True)
-    print("✅ Media directories created")
-    
     print("\n🎉 Setup completed successfully!")
     print("\nNext steps:")
     print("1. Set your OpenAI API key (if not already set)")
@@ -0,0 +1,20 @@
+"""
+Celery application for stylerecommend project.
+
+Workers are started with:
+    celery -A stylerecommend worker -Q gemini,openai,celery -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
+
+app = Celery('stylerecommend')
+
+# Read CELERY_* settings from Django settings
+app.config_from_object('django.conf:settings', namespace='CELERY')
+
+# Load tasks.py modules from all installed apps
+app.autodiscover_tasks()
@@ -66,13 +66,20 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Parse each template once per process (the runserver autoreloader resets it when templates change).
+            # Pages such as register aren't page-cached since they embed per-visitor CSRF tokens.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -131,6 +138,11 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Stream uploads to a temporary file instead of buffering them in memory
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+FILE_UPLOAD_MAX_MEMORY_SIZE = 0
+FILE_UPLOAD_TEMP_DIR = os.getenv('FILE_UPLOAD_TEMP_DIR') or None
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -157,3 +169,36 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'imageprocessor:upload'
 LOGOUT_REDIRECT_URL = 'login'
 
+
+# Celery settings (background image processing)
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+CELERY_TASK_ROUTES = {
+    # Gemini and OpenAI jobs go to dedicated queues so they can be scaled separately
+    'imageprocessor.tasks.process_image_task': {'queue': 'gemini'},
+    'imageprocessor.tasks.analyze_wardrobe_item_task': {'queue': 'openai'},
+}
+# Run tasks inline (no broker/worker needed) when set, e.g. for local development
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+if CELERY_TASK_ALWAYS_EAGER and 'CELERY_RESULT_BACKEND' not in os.environ:
+    # Keep inline task results in process memory so task status polling works without Redis
+    CELERY_RESULT_BACKEND = 'cache+memory://'
+    CELERY_TASK_STORE_EAGER_RESULT = True
+
+
+# Cache (shared between web and Celery workers when REDIS_CACHE_URL is set)
+if os.getenv('REDIS_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_CACHE_URL'),
+        }
+    }
+elif os.getenv('CACHE_DIR'):
+    # On-disk cache so API results survive restarts, e.g. across runs of the manual test scripts
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR'),
+        }
+    }
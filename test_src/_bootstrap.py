@@ -0,0 +1,18 @@
+"""
+Shared preamble for the test_src scripts: put the repository root on sys.path and set up Django once
+"""
+import os
+import sys
+from pathlib import Path
+
+import django
+
+# Repository root, so `stylerecommend` and `imageprocessor` import regardless of the working directory
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
+# Keep API results on disk so re-runs on the same test images skip the API (read by settings at setup)
+os.environ.setdefault('CACHE_DIR', str(PROJECT_ROOT / '.cache' / 'vision'))
+django.setup()
@@ -0,0 +1,35 @@
+"""
+Shared synthetic images for the manual test scripts
+"""
+import numpy as np
+from PIL import Image, ImageColor
+
+SHIRT_SIZE = (300, 400)  # width, height
+
+# Button layout: five 11px discs down the placket, 40px apart
+BUTTON_COUNT = 5
+BUTTON_TOP = 100
+BUTTON_SPACING = 40
+BUTTON_LEFT = 145
+BUTTON_DIAMETER = 11
+
+_yy, _xx = np.ogrid[:BUTTON_DIAMETER, :BUTTON_DIAMETER]
+_radius = (BUTTON_DIAMETER - 1) / 2
+BUTTON_OFFSETS = np.nonzero((_yy - _radius) ** 2 + (_xx - _radius) ** 2 <= (_radius + 0.5) ** 2)
+
+
+def make_test_shirt(color='darkgreen', size=SHIRT_SIZE):
+    """Build a plain shirt image (collar outline plus buttons) with NumPy slice assignment"""
+    width, height = size
+    arr = np.full((height, width, 3), ImageColor.getrgb(color), dtype=np.uint8)
+
+    # Collar: 2px black outline around (120, 50)-(180, 80)
+    arr[50:81, 120:181] = 0
+    arr[52:79, 122:179] = ImageColor.getrgb(color)
+
+    # Buttons: stamp every disc at once via fancy indexing
+    dy, dx = BUTTON_OFFSETS
+    rows = BUTTON_TOP + BUTTON_SPACING * np.arange(BUTTON_COUNT)[:, None] + dy
+    arr[rows, BUTTON_LEFT + dx] = 0
+
+    return Image.fromarray(arr)
@@ -0,0 +1,99 @@
+"""
+Submit GPT-4 Vision clothing analyses through the OpenAI Batch API (half price, up to 24h turnaround)
+"""
+import io
+import json
+import time
+
+from django.core.cache import cache
+
+from imageprocessor.openai_cache import OPENAI_CACHE_TIMEOUT, make_cache_key
+from imageprocessor.services import read_image_bytes
+
+# Same request parameters as OpenAIImageProcessor._analyze_clothing_image
+BATCH_MODEL = "gpt-4o"
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_POLL_INTERVAL = 30  # seconds
+# How long a script waits before cancelling; batches usually finish well inside OpenAI's 24h window
+BATCH_TIMEOUT = 60 * 60  # seconds
+
+# Batch states after which no more output will appear
+BATCH_FINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _parse_analysis(text):
+    """Parse the JSON analysis from a response, allowing for a markdown code fence"""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    return json.loads(text)
+
+
+def submit_vision_batch(processor, images, poll_interval=BATCH_POLL_INTERVAL, timeout=BATCH_TIMEOUT):
+    """Analyze (image, clothing_type) pairs in one batch job; results come back in input order
+
+    Waits at most timeout seconds, then cancels the batch and reports the pending images as timed out.
+    Results share the analysis cache with OpenAIImageProcessor.analyze_clothing_image, so cached images are not resubmitted.
+    """
+    results = [None] * len(images)
+    cache_keys = [None] * len(images)
+    pending = []
+    lines = []
+    for index, (image, clothing_type) in enumerate(images):
+        image_bytes = read_image_bytes(image)
+        cache_keys[index] = make_cache_key(image_bytes, clothing_type, BATCH_MODEL, processor.PROMPT_VERSION)
+        results[index] = cache.get(cache_keys[index])
+        if results[index] is not None:
+            continue
+        body = {
+            "model": BATCH_MODEL,
+            "messages": processor.build_analysis_messages(image_bytes, clothing_type),
+            "max_tokens": 500,
+            "temperature": 0.1,
+        }
+        pending.append(index)
+        lines.append(json.dumps({"custom_id": str(index), "method": "POST", "url": BATCH_ENDPOINT, "body": body}))
+
+    if not lines:
+        print("   💾 All analyses served from cache")
+        return results
+
+    client = processor.client
+    batch_file = client.files.create(
+        file=("vision_batch.jsonl", io.BytesIO("\n".join(lines).encode())),
+        purpose="batch",
+    )
+    batch = client.batches.create(input_file_id=batch_file.id, endpoint=BATCH_ENDPOINT, completion_window="24h")
+    print(f"   📦 Submitted batch {batch.id} with {len(lines)} request(s)")
+
+    deadline = time.monotonic() + timeout
+    while batch.status not in BATCH_FINAL_STATES:
+        if time.monotonic() >= deadline:
+            client.batches.cancel(batch.id)
+            print(f"   ⌛ Batch {batch.id} timed out after {timeout}s, cancelled")
+            for index in pending:
+                results[index] = {'success': False, 'error': 'Batch timed out'}
+            return results
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+        print(f"   ⏳ Batch {batch.id}: {batch.status}")
+
+    for index in pending:
+        results[index] = {'success': False, 'error': f'Batch {batch.status}'}
+    if not batch.output_file_id:
+        return results
+
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        record = json.loads(line)
+        index = int(record["custom_id"])
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            results[index] = {'success': False, 'error': str(record.get("error") or response.get("body"))}
+            continue
+        analysis_text = response["body"]["choices"][0]["message"]["content"]
+        try:
+            results[index] = {'success': True, 'analysis': _parse_analysis(analysis_text)}
+            cache.set(cache_keys[index], results[index], OPENAI_CACHE_TIMEOUT)
+        except json.JSONDecodeError:
+            results[index] = {'success': False, 'error': 'Unparseable analysis', 'raw_text': analysis_text}
+    return results
@@ -0,0 +1,40 @@
+"""
+pytest setup shared by the test_src scripts
+"""
+import pytest
+
+# Scripts that call billed OpenAI/Gemini endpoints (GPT-4 Vision, DALL-E 3, image edits, Gemini generation).
+# They are tagged here rather than with decorators so the scripts still run without pytest installed.
+PAID_SCRIPTS = {
+    'test_chatgpt_processing',
+    'test_chatgpt_simple',
+    'test_color_preservation',
+    'test_composite',
+    'test_dalle_direct',
+    'test_gpt4_dalle',
+    'test_new_workflow',
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption('--run-paid', action='store_true', help='also run tests that call billed AI APIs')
+
+
+def pytest_configure(config):
+    """Set up Django once per interpreter, before collection imports any script"""
+    config.addinivalue_line('markers', 'paid: calls a billed AI API (skipped unless --run-paid)')
+    config.addinivalue_line('markers', 'network: needs network access to an external API')
+    import _bootstrap  # noqa: F401
+
+
+def pytest_collection_modifyitems(config, items):
+    """Tag the paid scripts and skip them unless --run-paid is given"""
+    run_paid = config.getoption('--run-paid')
+    skip_paid = pytest.mark.skip(reason='paid API (use --run-paid)')
+    for item in items:
+        if item.module.__name__ not in PAID_SCRIPTS:
+            continue
+        item.add_marker(pytest.mark.paid)
+        item.add_marker(pytest.mark.network)
+        if not run_paid:
+            item.add_marker(skip_paid)
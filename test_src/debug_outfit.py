@@ -1,16 +1,10 @@
 #!/usr/bin/env python3
 import os
-import sys
-import django
 
-# Add the project directory to Python path
-sys.path.append('/home/ponir/Documents/clients/jake/ai-projects/stylerecomend/stylerecommend')
+# Put the repository root on sys.path and set up Django
+import _bootstrap  # noqa: F401
 
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
-django.setup()
-
-from imageprocessor.services import StyleRecommendationService
+from imageprocessor.services import get_style_service
 from imageprocessor.models import WardrobeItem
 import logging
 
@@ -25,7 +19,7 @@ def test_outfit_generation():
     print(f"WardrobeItem count: {WardrobeItem.objects.count()}")
     
     # Get a sample item
-    item = WardrobeItem.objects.first()
+    item = WardrobeItem.objects.select_related('processed_image').first()
     if item:
         print(f"Sample item: {item.name}")
         print(f"Has processed_image: {hasattr(item, 'processed_image')}")
@@ -43,8 +37,8 @@ def test_outfit_generation():
     # Test outfit generation
     print("\n=== Testing Outfit Generation ===")
     try:
-        service = StyleRecommendationService()
-        result = service.generate_outfit_recommendations('casual', 'all', 1)
+        service = get_style_service()
+        result = service.generate_outfit_recommendations(occasion='casual', season='all', max_outfits=1)
         print(f"Success: {result['success']}")
         if result['success']:
             print(f"Outfits count: {len(result.get('outfits', []))}")
@@ -2,30 +2,21 @@
 """
 Test script to verify ChatGPT normal API integration
 """
-import os
-import sys
-import django
-from pathlib import Path
 
-# Add the project directory to Python path
-project_dir = Path(__file__).parent
-sys.path.insert(0, str(project_dir))
-
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
-django.setup()
+# Put the repository root on sys.path and set up Django
+import _bootstrap  # noqa: F401
 
 def test_chatgpt_simple():
     print("🧪 Testing ChatGPT Normal API Integration")
     print("=" * 50)
     
     try:
-        from imageprocessor.services import OpenAIImageProcessor
+        from imageprocessor.services import OPENAI_API_KEY, get_openai_processor
         from PIL import Image
-        import tempfile
+        from io import BytesIO
         
         # Check API key
-        api_key = os.getenv('OPENAI_API_KEY')
+        api_key = OPENAI_API_KEY
         if not api_key:
             print("❌ OpenAI API key not found!")
             return
@@ -36,20 +27,20 @@ def test_chatgpt_simple():
         print("\n1. Creating test clothing image...")
         test_image = Image.new('RGB', (200, 200), color='navy')
         
-        # Save as temporary JPEG
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
-            test_image.save(tmp_file.name, 'JPEG')
-            temp_jpg_path = tmp_file.name
+        # Encode the JPEG in memory; the processor accepts image bytes directly
+        buffer = BytesIO()
+        test_image.save(buffer, 'JPEG')
+        test_jpg_bytes = buffer.getvalue()
         
-        print(f"   ✅ Created test image: {temp_jpg_path}")
+        print(f"   ✅ Created test image ({len(test_jpg_bytes)} bytes)")
         
         # Test the service
         print("\n2. Testing ChatGPT API integration...")
-        processor = OpenAIImageProcessor()
+        processor = get_openai_processor()
         
         try:
             # Test the processing
-            result = processor.process_image_with_openai(temp_jpg_path, 'shirt')
+            result = processor.process_image_with_openai(test_jpg_bytes, 'shirt')
             
             if result['success']:
                 print("   ✅ ChatGPT API integration successful!")
@@ -74,11 +65,6 @@ def test_chatgpt_simple():
             import traceback
             traceback.print_exc()
         
-        # Clean up
-        if os.path.exists(temp_jpg_path):
-            os.remove(temp_jpg_path)
-            print("\n   🧹 Cleaned up temporary test file")
-        
         print("\n🎉 ChatGPT integration test completed!")
         print("\n📋 Summary:")
         print("- Uses ChatGPT normal API (GPT-4o with vision)")
@@ -3,29 +3,24 @@
 Test script to verify color preservation in image processing
 """
 import os
-import sys
-import django
-from pathlib import Path
 
-# Add the project directory to Python path
-project_dir = Path(__file__).parent
-sys.path.insert(0, str(project_dir))
-
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
-django.setup()
+# Put the repository root on sys.path and set up Django
+import _bootstrap  # noqa: F401
 
 def test_color_preservation():
     print("🧪 Testing Color Preservation in Image Processing")
     print("=" * 55)
     
     try:
-        from imageprocessor.services import OpenAIImageProcessor
+        from imageprocessor.services import OPENAI_API_KEY, get_openai_processor
+        from imageprocessor.color_metrics import color_preservation_delta_e
+        from _fixtures import make_test_shirt
         from PIL import Image
         import tempfile
+        from io import BytesIO
         
         # Check API key
-        api_key = os.getenv('OPENAI_API_KEY')
+        api_key = OPENAI_API_KEY
         if not api_key:
             print("❌ OpenAI API key not found!")
             return
@@ -36,34 +31,23 @@ def test_color_preservation():
         print("\n1. Creating test image with specific colors...")
         
         # Create a colored shirt image
-        test_image = Image.new('RGB', (300, 400), color='darkgreen')  # Dark green shirt
-        
-        # Add some simple features to make it look like a shirt
-        from PIL import ImageDraw
-        draw = ImageDraw.Draw(test_image)
-        
-        # Draw a simple collar
-        draw.rectangle([120, 50, 180, 80], fill='darkgreen', outline='black', width=2)
+        # Shirt with collar and buttons, built with NumPy (see _fixtures.py)
+        test_image = make_test_shirt('darkgreen')  # Dark green shirt
         
-        # Draw buttons
-        for i in range(5):
-            y_pos = 100 + i * 40
-            draw.ellipse([145, y_pos, 155, y_pos + 10], fill='black')
+        # Encode the JPEG in memory; the processor accepts image bytes directly
+        buffer = BytesIO()
+        test_image.save(buffer, 'JPEG')
+        test_jpg_bytes = buffer.getvalue()
         
-        # Save as temporary JPEG
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
-            test_image.save(tmp_file.name, 'JPEG')
-            temp_jpg_path = tmp_file.name
-        
-        print(f"   ✅ Created dark green shirt test image: {temp_jpg_path}")
+        print(f"   ✅ Created dark green shirt test image ({len(test_jpg_bytes)} bytes)")
         
         # Test the service
         print("\n2. Testing image processing with color preservation...")
-        processor = OpenAIImageProcessor()
+        processor = get_openai_processor()
         
         try:
             # Test the processing
-            result = processor.process_image_with_openai(temp_jpg_path, 'shirt')
+            result = processor.process_image_with_openai(test_jpg_bytes, 'shirt')
             
             if result['success']:
                 print("   ✅ Image processing successful!")
@@ -71,12 +55,19 @@ def test_color_preservation():
                 print(f"   🔍 Analysis: {result.get('analysis', 'No analysis available')[:100]}...")
                 
                 # Save the result for inspection
-                output_path = temp_jpg_path.replace('.jpg', '_processed.png')
+                output_path = os.path.join(tempfile.gettempdir(), 'test_shirt_processed.png')
                 with open(output_path, 'wb') as f:
                     f.write(result['processed_image_data'])
                 
                 print(f"   💾 Processed image saved: {output_path}")
-                print("   🔍 Please check if the colors are preserved in the processed image")
+                
+                # Measure colour drift on the garment pixels (CIELAB ΔE; below ~10 reads as the same colour)
+                delta_e = color_preservation_delta_e(test_image, Image.open(BytesIO(result['processed_image_data'])))
+                if delta_e is None:
+                    print("   ⚠️ No garment pixels found in the processed image")
+                else:
+                    status = "✅" if delta_e < 10 else "⚠️"
+                    print(f"   {status} Mean colour difference (ΔE): {delta_e:.1f}")
                 
             else:
                 print(f"   ❌ Image processing failed: {result['error']}")
@@ -86,11 +77,6 @@ def test_color_preservation():
             import traceback
             traceback.print_exc()
         
-        # Clean up
-        if os.path.exists(temp_jpg_path):
-            os.remove(temp_jpg_path)
-            print("\n   🧹 Cleaned up temporary test file")
-        
         print("\n🎉 Color preservation test completed!")
         print("\n📋 Summary:")
         print("- The system now tries multiple approaches:")
@@ -1,17 +1,10 @@
 #!/usr/bin/env python3
-import os
-import sys
-import django
 import logging
 
-# Add the project directory to Python path
-sys.path.append('/home/ponir/Documents/clients/jake/ai-projects/stylerecomend/stylerecommend')
+# Put the repository root on sys.path and set up Django
+import _bootstrap  # noqa: F401
 
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
-django.setup()
-
-from imageprocessor.services import StyleRecommendationService
+from imageprocessor.services import get_style_service
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -20,8 +13,8 @@ def test_composite_generation():
     print("=== Testing Composite Generation ===")
     
     try:
-        service = StyleRecommendationService()
-        result = service.generate_outfit_recommendations('casual', 'all', 2)
+        service = get_style_service()
+        result = service.generate_outfit_recommendations(occasion='casual', season='all', max_outfits=2)
         print(f"Success: {result['success']}")
         if result['success']:
             print(f"Outfits count: {len(result.get('outfits', []))}")
@@ -3,29 +3,22 @@
 Test script to verify direct DALL-E 3 processing with uploaded image
 """
 import os
-import sys
-import django
-from pathlib import Path
 
-# Add the project directory to Python path
-project_dir = Path(__file__).parent
-sys.path.insert(0, str(project_dir))
-
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
-django.setup()
+# Put the repository root on sys.path and set up Django
+import _bootstrap  # noqa: F401
 
 def test_dalle_direct():
     print("🧪 Testing Direct DALL-E 3 Processing")
     print("=" * 45)
     
     try:
-        from imageprocessor.services import OpenAIImageProcessor
-        from PIL import Image
+        from imageprocessor.services import OPENAI_API_KEY, get_openai_processor
+        from _fixtures import make_test_shirt
         import tempfile
+        from io import BytesIO
         
         # Check API key
-        api_key = os.getenv('OPENAI_API_KEY')
+        api_key = OPENAI_API_KEY
         if not api_key:
             print("❌ OpenAI API key not found!")
             return
@@ -34,34 +27,23 @@ def test_dalle_direct():
         
         # Create a test image
         print("\n1. Creating test clothing image...")
-        test_image = Image.new('RGB', (300, 400), color='darkgreen')
-        
-        # Add some features to make it look like a shirt
-        from PIL import ImageDraw
-        draw = ImageDraw.Draw(test_image)
-        
-        # Draw a collar
-        draw.rectangle([120, 50, 180, 80], fill='darkgreen', outline='black', width=2)
+        # Shirt with collar and buttons, built with NumPy (see _fixtures.py)
+        test_image = make_test_shirt('darkgreen')
         
-        # Draw buttons
-        for i in range(5):
-            y_pos = 100 + i * 40
-            draw.ellipse([145, y_pos, 155, y_pos + 10], fill='black')
+        # Encode the JPEG in memory; the processor accepts image bytes directly
+        buffer = BytesIO()
+        test_image.save(buffer, 'JPEG')
+        test_jpg_bytes = buffer.getvalue()
         
-        # Save as temporary JPEG
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
-            test_image.save(tmp_file.name, 'JPEG')
-            temp_jpg_path = tmp_file.name
-        
-        print(f"   ✅ Created test image: {temp_jpg_path}")
+        print(f"   ✅ Created test image ({len(test_jpg_bytes)} bytes)")
         
         # Test the service
         print("\n2. Testing direct DALL-E 3 processing...")
-        processor = OpenAIImageProcessor()
+        processor = get_openai_processor()
         
         try:
             # Test the processing
-            result = processor.process_image_with_openai(temp_jpg_path, 'shirt')
+            result = processor.process_image_with_openai(test_jpg_bytes, 'shirt')
             
             if result['success']:
                 print("   ✅ DALL-E 3 processing successful!")
@@ -70,7 +52,7 @@ def test_dalle_direct():
                 
                 # Save the processed image
                 if result.get('processed_image_data'):
-                    output_path = temp_jpg_path.replace('.jpg', '_processed.png')
+                    output_path = os.path.join(tempfile.gettempdir(), 'test_shirt_processed.png')
                     with open(output_path, 'wb') as f:
                         f.write(result['processed_image_data'])
                     print(f"   💾 Processed image saved: {output_path}")
@@ -90,11 +72,6 @@ def test_dalle_direct():
             import traceback
             traceback.print_exc()
         
-        # Clean up
-        if os.path.exists(temp_jpg_path):
-            os.remove(temp_jpg_path)
-            print("\n   🧹 Cleaned up temporary test file")
-        
         print("\n🎉 Direct DALL-E 3 processing test completed!")
         print("\n📋 How it works:")
         print("1. Takes your uploaded image")
@@ -2,30 +2,22 @@
 """
 Test script to verify GPT-4 Vision + DALL-E 3 integration
 """
-import os
-import sys
-import django
-from pathlib import Path
 
-# Add the project directory to Python path
-project_dir = Path(__file__).parent
-sys.path.insert(0, str(project_dir))
-
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
-django.setup()
+# Put the repository root on sys.path and set up Django
+import _bootstrap  # noqa: F401
 
 def test_gpt4_dalle_integration():
     print("🧪 Testing GPT-4 Vision + DALL-E 3 Integration")
     print("=" * 55)
     
     try:
-        from imageprocessor.services import OpenAIImageProcessor
+        from imageprocessor.services import OPENAI_API_KEY, get_openai_processor
+        from _vision_batch import submit_vision_batch
         from PIL import Image
-        import tempfile
+        from io import BytesIO
         
         # Check API key
-        api_key = os.getenv('OPENAI_API_KEY')
+        api_key = OPENAI_API_KEY
         if not api_key:
             print("❌ OpenAI API key not found!")
             print("💡 Please set your API key: export OPENAI_API_KEY=your_key_here")
@@ -37,25 +29,24 @@ def test_gpt4_dalle_integration():
         print("\n1. Creating test clothing image...")
         test_image = Image.new('RGB', (200, 200), color='navy')
         
-        # Save as temporary JPEG
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
-            test_image.save(tmp_file.name, 'JPEG')
-            temp_jpg_path = tmp_file.name
+        # Encode as JPEG in memory, no temp file needed
+        jpg_buffer = BytesIO()
+        test_image.save(jpg_buffer, 'JPEG')
         
-        print(f"   ✅ Created test image: {temp_jpg_path}")
+        print(f"   ✅ Created test image in memory ({jpg_buffer.getbuffer().nbytes} bytes)")
         
         # Test the service
         print("\n2. Testing GPT-4 Vision + DALL-E 3 integration...")
-        processor = OpenAIImageProcessor()
+        processor = get_openai_processor()
         
         try:
-            # Test GPT-4 Vision analysis only (to avoid DALL-E costs)
-            print("   🔍 Testing GPT-4 Vision analysis...")
-            analysis_result = processor.analyze_image_with_gpt4_vision(temp_jpg_path, 'jacket')
+            # Test GPT-4 Vision analysis only (to avoid DALL-E costs); the Batch API halves the price
+            print("   🔍 Testing GPT-4 Vision analysis (Batch API, may take a while)...")
+            analysis_result, = submit_vision_batch(processor, [(jpg_buffer.getvalue(), 'jacket')])
             
             if analysis_result['success']:
                 print("   ✅ GPT-4 Vision analysis successful!")
-                print(f"   📝 Analysis preview: {analysis_result['analysis'][:150]}...")
+                print(f"   📝 Analysis preview: {str(analysis_result['analysis'])[:150]}...")
                 
                 # Test DALL-E 3 generation (commented out to avoid costs)
                 print("\n   🎨 DALL-E 3 generation test (skipped to avoid costs)")
@@ -77,11 +68,6 @@ def test_gpt4_dalle_integration():
             import traceback
             traceback.print_exc()
         
-        # Clean up
-        if os.path.exists(temp_jpg_path):
-            os.remove(temp_jpg_path)
-            print("\n   🧹 Cleaned up temporary test file")
-            
         print("\n🎉 Integration test completed!")
         print("\n📋 Summary:")
         print("- GPT-4 Vision: Analyzes clothing images intelligently")
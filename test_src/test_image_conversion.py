@@ -2,49 +2,40 @@
 """
 Test script to verify image conversion for OpenAI API compatibility
 """
-import os
-import sys
-import django
-from pathlib import Path
 
-# Add the project directory to Python path
-project_dir = Path(__file__).parent
-sys.path.insert(0, str(project_dir))
-
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
-django.setup()
+# Put the repository root on sys.path and set up Django
+import _bootstrap  # noqa: F401
 
 def test_image_conversion():
     print("🧪 Testing Image Conversion for OpenAI API")
     print("=" * 50)
     
     try:
-        from imageprocessor.services import OpenAIImageProcessor
+        from imageprocessor.services import get_openai_processor
         from PIL import Image
-        import tempfile
+        from io import BytesIO
         
         # Create a test RGB image
         print("1. Creating test RGB image...")
         test_image = Image.new('RGB', (100, 100), color='red')
         
-        # Save as temporary JPEG
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
-            test_image.save(tmp_file.name, 'JPEG')
-            temp_jpg_path = tmp_file.name
+        # Encode as JPEG in memory, no temp file needed
+        jpg_buffer = BytesIO()
+        test_image.save(jpg_buffer, 'JPEG')
+        jpg_buffer.seek(0)
         
-        print(f"   ✅ Created test JPEG: {temp_jpg_path}")
+        print(f"   ✅ Created test JPEG in memory ({jpg_buffer.getbuffer().nbytes} bytes)")
         
         # Test the conversion
         print("\n2. Testing image conversion...")
-        processor = OpenAIImageProcessor()
+        processor = get_openai_processor()
         
         try:
-            png_path = processor.convert_to_png(temp_jpg_path)
-            print(f"   ✅ Converted to PNG: {png_path}")
+            png_buffer = processor.convert_to_png(jpg_buffer)
+            print(f"   ✅ Converted to PNG in memory ({png_buffer.getbuffer().nbytes} bytes)")
             
             # Verify the converted image
-            with Image.open(png_path) as converted_img:
+            with Image.open(png_buffer) as converted_img:
                 print(f"   📊 Original mode: RGB")
                 print(f"   📊 Converted mode: {converted_img.mode}")
                 print(f"   📊 Converted size: {converted_img.size}")
@@ -53,19 +44,9 @@ def test_image_conversion():
                     print("   ✅ Image format is compatible with OpenAI API!")
                 else:
                     print(f"   ❌ Image format {converted_img.mode} is NOT compatible with OpenAI API")
-            
-            # Clean up
-            if os.path.exists(png_path):
-                os.remove(png_path)
-                print("   🧹 Cleaned up temporary PNG file")
                 
         except Exception as e:
             print(f"   ❌ Conversion failed: {e}")
-        
-        # Clean up
-        if os.path.exists(temp_jpg_path):
-            os.remove(temp_jpg_path)
-            print("   🧹 Cleaned up temporary JPEG file")
             
     except Exception as e:
         print(f"❌ Test failed: {e}")
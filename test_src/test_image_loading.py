@@ -1,23 +1,57 @@
 #!/usr/bin/env python3
 import os
-import sys
-import django
+import struct
 
-# Add the project directory to Python path
-sys.path.append('/home/ponir/Documents/clients/jake/ai-projects/stylerecomend/stylerecommend')
-
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
-django.setup()
+# Put the repository root on sys.path and set up Django
+import _bootstrap  # noqa: F401
 
 from imageprocessor.models import WardrobeItem
 from PIL import Image
 
+# JPEG start-of-frame markers (0xC4 DHT, 0xC8 JPG and 0xCC DAC share the range but carry no size)
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def peek_dims(path):
+    """Read (width, height) from a PNG/JPEG header without decoding; other formats fall back to PIL's lazy open"""
+    with open(path, 'rb') as f:
+        head = f.read(24)
+        if head.startswith(b'\x89PNG\r\n\x1a\n'):
+            # IHDR is always the first chunk: width and height are big-endian uint32s
+            return struct.unpack('>II', head[16:24])
+        if head.startswith(b'\xff\xd8'):
+            # Walk the marker segments until a start-of-frame, which holds height then width
+            f.seek(2)
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    break
+                if marker[1] == 0xFF:
+                    # Fill byte before the real marker
+                    f.seek(-1, os.SEEK_CUR)
+                    continue
+                (length,) = struct.unpack('>H', f.read(2))
+                if marker[1] in JPEG_SOF_MARKERS:
+                    height, width = struct.unpack('>xHH', f.read(5))
+                    return width, height
+                f.seek(length - 2, os.SEEK_CUR)
+    with Image.open(path) as img:
+        return img.size
+
+
 def test_image_loading():
     print("=== Testing Image Loading ===")
     
-    # Get a sample wardrobe item
-    item = WardrobeItem.objects.first()
+    # Get a sample wardrobe item with its processed image in one query, loading only the fields printed below
+    item = (
+        WardrobeItem.objects.select_related('processed_image')
+        .only(
+            'name',
+            'processed_image__clothing_type', 'processed_image__status', 'processed_image__created_at',
+            'processed_image__processed_image', 'processed_image__original_image',
+        )
+        .first()
+    )
     if not item:
         print("No wardrobe items found!")
         return
@@ -37,8 +71,7 @@ def test_image_loading():
                 print(f"File exists: {os.path.exists(image_path)}")
                 
                 if os.path.exists(image_path):
-                    img = Image.open(image_path)
-                    print(f"Successfully loaded processed image: {img.size}")
+                    print(f"Successfully loaded processed image: {peek_dims(image_path)}")
                 else:
                     print("Processed image file not found!")
             except Exception as e:
@@ -52,8 +85,7 @@ def test_image_loading():
                 print(f"File exists: {os.path.exists(image_path)}")
                 
                 if os.path.exists(image_path):
-                    img = Image.open(image_path)
-                    print(f"Successfully loaded original image: {img.size}")
+                    print(f"Successfully loaded original image: {peek_dims(image_path)}")
                 else:
                     print("Original image file not found!")
             except Exception as e:
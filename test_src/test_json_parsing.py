@@ -3,7 +3,41 @@
 Test script to verify JSON parsing from ChatGPT responses
 """
 import json
-import re
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the stdlib error either way
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _find_json_span(s):
+    """Return (start, end) of the first balanced {...} object in s (string-literal aware), or None"""
+    start = None
+    depth = 0
+    in_string = False
+    escape = False
+    for i, ch in enumerate(s):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = start is not None
+        elif ch == '{':
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == '}' and depth:
+            depth -= 1
+            if depth == 0:
+                return start, i
+    return None
+
 
 def test_json_parsing():
     """Test JSON parsing with various ChatGPT response formats"""
@@ -47,25 +81,21 @@ That's the complete analysis."""
     
     def parse_chatgpt_response(response_text):
         """Parse ChatGPT response to extract JSON"""
+        # Strip a surrounding markdown code fence, if any
+        text = response_text.strip()
+        if text.startswith('```'):
+            text = text.removeprefix('```').removeprefix('json').removesuffix('```').strip()
         try:
             # First, try direct JSON parsing
-            return json.loads(response_text)
+            return _json_loads(text)
         except json.JSONDecodeError:
-            # Try to extract JSON from markdown code blocks
-            try:
-                # Look for JSON in markdown code blocks
-                json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(1)
-                    return json.loads(json_str)
-                
-                # Try to find JSON object without code blocks
-                json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    return json.loads(json_str)
-            except (json.JSONDecodeError, AttributeError):
-                pass
+            # Fall back to the first balanced JSON object in the text
+            span = _find_json_span(text)
+            if span:
+                try:
+                    return _json_loads(text[span[0]:span[1] + 1])
+                except json.JSONDecodeError:
+                    pass
             
             # Return None if parsing fails
             return None
@@ -2,30 +2,51 @@
 """
 Test script to verify the new ChatGPT + Gemini workflow
 """
+import asyncio
 import os
-import sys
-import django
-from pathlib import Path
 
-# Add the project directory to Python path
-project_dir = Path(__file__).parent
-sys.path.insert(0, str(project_dir))
+# Put the repository root on sys.path and set up Django
+import _bootstrap  # noqa: F401
+
+# Images whose analysis + Gemini processing may be in flight at once, to stay under API tier limits
+WORKFLOW_CONCURRENCY = 4
+
+
+async def _run_workflow(semaphore, openai_processor, gemini_processor, image_path, clothing_type):
+    """Run the OpenAI analysis and Gemini processing for one image concurrently"""
+    async with semaphore:
+        # Both clients are synchronous, so each call runs in a worker thread
+        return await asyncio.gather(
+            asyncio.to_thread(openai_processor.analyze_clothing_image, image_path, clothing_type),
+            asyncio.to_thread(gemini_processor.process_image_with_gemini, image_path, clothing_type),
+            return_exceptions=True,
+        )
+
+
+async def _run_workflows(image_paths, clothing_type):
+    """Run the workflow for every image, WORKFLOW_CONCURRENCY at a time"""
+    from imageprocessor.services import get_gemini_processor, get_openai_processor
+
+    semaphore = asyncio.Semaphore(WORKFLOW_CONCURRENCY)
+    openai_processor = get_openai_processor()
+    gemini_processor = get_gemini_processor()
+    return await asyncio.gather(*[
+        _run_workflow(semaphore, openai_processor, gemini_processor, path, clothing_type)
+        for path in image_paths
+    ])
 
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
-django.setup()
 
 def test_new_workflow():
     print("🧪 Testing New ChatGPT + Gemini Workflow")
     print("=" * 50)
     
     try:
-        from imageprocessor.services import OpenAIImageProcessor, GeminiImageProcessor
-        from PIL import Image
+        from imageprocessor.services import OPENAI_API_KEY
+        from _fixtures import make_test_shirt
         import tempfile
         
         # Check API keys
-        openai_key = os.getenv('OPENAI_API_KEY')
+        openai_key = OPENAI_API_KEY
         gemini_key = os.getenv('GEMINI_API_KEY')
         
         if not openai_key:
@@ -40,33 +61,24 @@ def test_new_workflow():
         
         # Create a test image
         print("\n1. Creating test clothing image...")
-        test_image = Image.new('RGB', (300, 400), color='darkblue')
-        
-        # Add some features to make it look like a shirt
-        from PIL import ImageDraw
-        draw = ImageDraw.Draw(test_image)
-        
-        # Draw a collar
-        draw.rectangle([120, 50, 180, 80], fill='darkblue', outline='black', width=2)
-        
-        # Draw buttons
-        for i in range(5):
-            y_pos = 100 + i * 40
-            draw.ellipse([145, y_pos, 155, y_pos + 10], fill='black')
-        
-        # Save as temporary JPEG
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
-            test_image.save(tmp_file.name, 'JPEG')
-            temp_jpg_path = tmp_file.name
-        
-        print(f"   ✅ Created test image: {temp_jpg_path}")
+        # Shirt with collar and buttons, built with NumPy (see _fixtures.py)
+        test_image = make_test_shirt('darkblue')
+        
+        # Gemini takes a path, so write a temporary JPEG; it is deleted on close, once both calls have returned
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as tmp_file:
+            test_image.save(tmp_file, 'JPEG')
+            tmp_file.flush()
+            print(f"   ✅ Created test image: {tmp_file.name}")
+            
+            # The two API calls are independent, so run them side by side and report each in turn
+            (analysis_result, gemini_result), = asyncio.run(_run_workflows([tmp_file.name], 'shirt'))
         
         # Test ChatGPT analysis
         print("\n2. Testing ChatGPT clothing analysis...")
-        openai_processor = OpenAIImageProcessor()
         
         try:
-            analysis_result = openai_processor.analyze_clothing_image(temp_jpg_path, 'shirt')
+            if isinstance(analysis_result, Exception):
+                raise analysis_result
             
             if analysis_result['success']:
                 analysis_data = analysis_result['analysis']
@@ -88,10 +100,10 @@ def test_new_workflow():
         
         # Test Gemini image processing
         print("\n3. Testing Gemini image processing...")
-        gemini_processor = GeminiImageProcessor()
         
         try:
-            gemini_result = gemini_processor.process_image_with_gemini(temp_jpg_path, 'shirt')
+            if isinstance(gemini_result, Exception):
+                raise gemini_result
             
             if gemini_result['success']:
                 print(f"   ✅ Gemini processing successful")
@@ -104,13 +116,6 @@ def test_new_workflow():
         except Exception as e:
             print(f"   ❌ Error in Gemini processing: {e}")
         
-        # Clean up
-        try:
-            os.remove(temp_jpg_path)
-            print(f"\n   ✅ Cleaned up test image: {temp_jpg_path}")
-        except Exception as e:
-            print(f"\n   ⚠️  Could not remove test image: {e}")
-        
         print("\n🎉 New workflow test completed!")
         
     except Exception as e:
@@ -2,25 +2,16 @@
 """
 Test script to verify prompt generation for different clothing types
 """
-import os
-import sys
-import django
-from pathlib import Path
 
-# Add the project directory to Python path
-project_dir = Path(__file__).parent
-sys.path.insert(0, str(project_dir))
-
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
-django.setup()
+# Put the repository root on sys.path and set up Django
+import _bootstrap  # noqa: F401
 
 def test_prompt_generation():
     print("🧪 Testing Prompt Generation for Different Clothing Types")
     print("=" * 60)
     
     try:
-        from imageprocessor.services import OpenAIImageProcessor
+        from imageprocessor.services import get_openai_processor
         
         # Test different clothing types
         clothing_types = [
@@ -28,7 +19,7 @@ def test_prompt_generation():
             'hoodie', 'coat', 'blouse', 'skirt', 'shorts', 'other'
         ]
         
-        processor = OpenAIImageProcessor()
+        processor = get_openai_processor()
         
         print("Generated prompts for different clothing types:\n")
         
@@ -2,18 +2,15 @@
 """
 Test script to verify the Django application setup
 """
-import os
-import sys
-import django
 from pathlib import Path
 
-# Add the project directory to Python path
-project_dir = Path(__file__).parent
-sys.path.insert(0, str(project_dir))
+# Put the repository root on sys.path and set up Django
+import _bootstrap  # noqa: F401
 
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stylerecommend.settings')
-django.setup()
+# Directories the app writes uploads and results into, created if missing
+REQUIRED_DIRS = tuple(Path(p) for p in ('media', 'media/original_images', 'media/processed_images'))
+# Template directories that must ship with the app
+TEMPLATE_DIRS = tuple(Path(p) for p in ('imageprocessor/templates', 'imageprocessor/templates/imageprocessor'))
 
 def test_setup():
     print("🧪 Testing Style Recommend Django Application Setup")
@@ -42,7 +39,8 @@ def test_setup():
     
     # Test 3: Check OpenAI API key
     print("\n3. Testing OpenAI API key...")
-    api_key = os.getenv('OPENAI_API_KEY')
+    from imageprocessor.services import OPENAI_API_KEY
+    api_key = OPENAI_API_KEY
     if api_key:
         print(f"   ✅ OpenAI API key found: {api_key[:10]}...")
     else:
@@ -58,8 +56,8 @@ def test_setup():
         
         # Test OpenAI service (will fail if no API key, but that's expected)
         try:
-            from imageprocessor.services import OpenAIImageProcessor
-            processor = OpenAIImageProcessor()
+            from imageprocessor.services import get_openai_processor
+            processor = get_openai_processor()
             print("   ✅ OpenAIImageProcessor initialized successfully")
         except ValueError as e:
             print(f"   ⚠️ OpenAIImageProcessor needs API key: {e}")
@@ -69,23 +67,20 @@ def test_setup():
     
     # Test 5: Check media directories
     print("\n5. Testing media directories...")
-    media_dirs = ['media', 'media/original_images', 'media/processed_images']
-    for dir_path in media_dirs:
-        if os.path.exists(dir_path):
+    for dir_path in REQUIRED_DIRS:
+        # A single mkdir both checks and creates, with no exists/create race
+        try:
+            dir_path.mkdir(parents=True)
+        except FileExistsError:
             print(f"   ✅ {dir_path} exists")
         else:
             print(f"   ❌ {dir_path} missing")
-            os.makedirs(dir_path, exist_ok=True)
             print(f"   🔧 Created {dir_path}")
     
     # Test 6: Check templates
     print("\n6. Testing templates...")
-    template_dirs = [
-        'imageprocessor/templates',
-        'imageprocessor/templates/imageprocessor'
-    ]
-    for dir_path in template_dirs:
-        if os.path.exists(dir_path):
+    for dir_path in TEMPLATE_DIRS:
+        if dir_path.is_dir():
             print(f"   ✅ {dir_path} exists")
         else:
             print(f"   ❌ {dir_path} missing")